@@ -1,4 +1,14 @@
+import json
+
+
 class Action:
   executor = 0
   def __init__(self, executor:int) -> None:
-    self.executor = executor
\ No newline at end of file
+    self.executor = executor
+
+  def to_dict(self) -> dict:
+    return dict(self.__dict__)
+
+  """Serialize the action exactly like jsonpickle.encode(action, unpicklable=False) would."""
+  def to_json(self) -> str:
+    return json.dumps(self.to_dict())
\ No newline at end of file
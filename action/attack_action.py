@@ -1,4 +1,3 @@
-from mimetypes import init
 from action.action import Action
 
 
@@ -6,4 +5,9 @@ class AttackAction(Action):
   target = 0
   def __init__(self, executor: int, target: int) -> None:
     super().__init__(executor)
-    self.target = target
\ No newline at end of file
+    self.target = target
+
+  def to_json(self) -> str:
+    if type(self.executor) is int and type(self.target) is int:
+      return '{"executor": %d, "target": %d}' % (self.executor, self.target)
+    return super().to_json()
\ No newline at end of file
@@ -8,4 +8,10 @@ class BuyAction(Action):
 
   def __init__(self, executor: int, item: Item) -> None:
     super().__init__(executor)
-    self.item = item.name
\ No newline at end of file
+    self.item = item.name
+
+  def to_json(self) -> str:
+    # item names are plain identifiers, so they never need escaping
+    if type(self.executor) is int and type(self.item) is str and self.item in Item.__members__:
+      return '{"executor": %d, "item": "%s"}' % (self.executor, self.item)
+    return super().to_json()
\ No newline at end of file
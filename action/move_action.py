@@ -6,4 +6,17 @@ class MoveAction(Action):
   destination = Position()
   def __init__(self, executor: int, destination: Position) -> None:
     super().__init__(executor)
-    self.destination = destination
\ No newline at end of file
+    self.destination = destination
+
+  def to_dict(self) -> dict:
+    d = super().to_dict()
+    if isinstance(self.destination, Position):
+      d["destination"] = {"x": self.destination.x, "y": self.destination.y}
+    return d
+
+  def to_json(self) -> str:
+    destination = self.destination
+    if type(self.executor) is int and isinstance(destination, Position) and type(destination.x) is int \
+        and type(destination.y) is int:
+      return '{"executor": %d, "destination": {"x": %d, "y": %d}}' % (self.executor, destination.x, destination.y)
+    return super().to_json()
\ No newline at end of file
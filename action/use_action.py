@@ -5,4 +5,9 @@ class UseAction(Action):
   use = False
   def __init__(self, executor: int, use: bool) -> None:
     super().__init__(executor)
-    self.use = use
\ No newline at end of file
+    self.use = use
+
+  def to_json(self) -> str:
+    if type(self.executor) is int and type(self.use) is bool:
+      return '{"executor": %d, "use": %s}' % (self.executor, "true" if self.use else "false")
+    return super().to_json()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import glob
+import json
+import logging
+from optparse import OptionParser
+import os
+import time
+from typing import List
+
+from game.game_state import GameState
+from game.game_state_decoder import GameStateDecoder
+from main import parse_json_as_game_state
+from simulator.replay import engine_line
+
+GAMELOGS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gamelogs", "*.json")
+
+
+"""Turn every recorded turn into the line the engine would send, in game order."""
+def load_payloads(paths: List[str]) -> List[str]:
+    payloads = []
+    for path in paths:
+        with open(path) as f:
+            for turn in json.load(f)['turns']:
+                payloads.append(engine_line(turn['turn'], turn['player_states']))
+    return payloads
+
+
+def flatten(game_state: GameState) -> list:
+    return [game_state.turn] + [(p.character_class, p.item, p.position.x, p.position.y, p.gold, p.score, p.health,
+                                 p.stat_set.max_health, p.stat_set.damage, p.stat_set.speed, p.stat_set.range)
+                                for p in game_state.player_state_list]
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options] [gamelog.json ...]")
+    parser.add_option("--rounds", "-r", dest="rounds", type="int", help="Passes over the payloads", default=5)
+    (options, args) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    payloads = load_payloads(args or sorted(glob.glob(GAMELOGS)))
+    decoder = GameStateDecoder()
+    for payload in payloads:
+        if flatten(decoder.decode(payload)) != flatten(parse_json_as_game_state(payload)):
+            raise AssertionError("GameStateDecoder disagrees with parse_json_as_game_state on " + payload)
+
+    timings = {}
+    for name, decode in (("parse_json_as_game_state", parse_json_as_game_state),
+                         ("GameStateDecoder.decode", GameStateDecoder().decode)):
+        best = None
+        for _ in range(options.rounds):
+            start = time.perf_counter()
+            for payload in payloads:
+                decode(payload)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        logging.info("%-26s %9.0f states/s (%.2f us/state)", name, len(payloads) / best, best / len(payloads) * 1e6)
+
+    logging.info("Speedup: %.2fx over %d payloads",
+                 timings["parse_json_as_game_state"] / timings["GameStateDecoder.decode"], len(payloads))
+
+
+if __name__ == '__main__':
+    main()
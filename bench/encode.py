@@ -0,0 +1,89 @@
+import copy
+import glob
+import json
+import logging
+from optparse import OptionParser
+import time
+from typing import List
+
+import jsonpickle
+
+from action.action import Action
+from action.attack_action import AttackAction
+from action.buy_action import BuyAction
+from action.move_action import MoveAction
+from action.use_action import UseAction
+from bench.decode import GAMELOGS
+from game.item import Item
+from game.position import Position
+
+
+"""Rebuild every action recorded in the gamelogs as the Action object the bot would have sent."""
+def load_actions(paths: List[str]) -> List[Action]:
+    actions = []
+    for path in paths:
+        with open(path) as f:
+            for turn in json.load(f)['turns'][1:]:
+                for use, move, attack, buy in zip(turn['use_actions'], turn['move_actions'],
+                                                  turn['attack_actions'], turn['buy_actions']):
+                    actions.append(UseAction(use['executor'], use['use']))
+                    destination = move['destination']
+                    actions.append(MoveAction(move['executor'], Position(destination['x'], destination['y'])))
+                    actions.append(AttackAction(attack['executor'], attack['target']))
+                    actions.append(BuyAction(buy['executor'], Item[buy['item']]))
+    return actions
+
+
+class PlainPosition:
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+"""Encode the action with jsonpickle the way main.py used to.
+
+jsonpickle cannot walk the slotted, immutable Position, so destinations are swapped for a plain
+object with the same attributes, which is what Position was when the wire format was defined.
+"""
+def jsonpickle_encode(action: Action) -> str:
+    if isinstance(action, MoveAction) and isinstance(action.destination, Position):
+        action = copy.copy(action)
+        action.destination = PlainPosition(action.destination.x, action.destination.y)
+    return jsonpickle.encode(action, unpicklable=False)
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options] [gamelog.json ...]")
+    parser.add_option("--rounds", "-r", dest="rounds", type="int", help="Passes over the actions", default=5)
+    (options, args) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    actions = load_actions(args or sorted(glob.glob(GAMELOGS)))
+    for action in actions:
+        expected = jsonpickle_encode(action)
+        if action.to_json() != expected:
+            raise AssertionError("to_json disagrees with jsonpickle on " + expected)
+
+    timings = {}
+    for name, encode in (("jsonpickle.encode", jsonpickle_encode),
+                         ("Action.to_json", lambda action: action.to_json())):
+        best = None
+        for _ in range(options.rounds):
+            start = time.perf_counter()
+            for action in actions:
+                encode(action)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        logging.info("%-18s %10.0f actions/s (%.2f us/action)", name, len(actions) / best, best / len(actions) * 1e6)
+
+    logging.info("Speedup: %.1fx over %d actions", timings["jsonpickle.encode"] / timings["Action.to_json"], len(actions))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import asyncio
+import glob
+import logging
+from optparse import OptionParser
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+import config
+from bench.decode import GAMELOGS
+from simulator.replay import phase_lines
+from simulator.server import StandInEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+"""Resident and peak resident memory of a process in KiB, read from /proc so only available on Linux."""
+def memory(pid: int) -> (int, int):
+    rss = hwm = 0
+    with open("/proc/%d/status" % pid) as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+            elif line.startswith("VmHWM:"):
+                hwm = int(line.split()[1])
+    return rss, hwm
+
+
+"""Launch the bots with one process per command and play one recorded game against them.
+
+:returns: seconds from launch until every bot reported its class, seconds until every bot played
+    the last turn, and the summed resident and peak resident memory of the bot processes in KiB.
+"""
+async def measure(commands: List[List[str]], turns: List[List[str]]) -> (float, float, int, int):
+    engine = StandInEngine(list(range(len(config.PORTS))))
+    # keep the bots alive after the last turn until their memory is read
+    engine.release.clear()
+    await engine.start()
+    start = time.perf_counter()
+    processes = [await asyncio.create_subprocess_exec(*command, cwd=ROOT, stdout=asyncio.subprocess.DEVNULL,
+                                                      stderr=asyncio.subprocess.DEVNULL) for command in commands]
+    game = asyncio.ensure_future(engine.play_recorded(turns))
+    await engine.played.wait()
+    elapsed = time.perf_counter() - start
+    startup = max(engine.report_times.values()) - start
+    rss, hwm = [sum(values) for values in zip(*[memory(process.pid) for process in processes])]
+    engine.release.set()
+    await game
+    for process in processes:
+        await process.wait()
+    await engine.stop()
+    return startup, elapsed, rss, hwm
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options] [gamelog.json]")
+    parser.add_option("--rounds", "-r", dest="rounds", type="int", help="Games played in each setup", default=5)
+    parser.add_option("--bot", "-b", dest="bot", help="Bot to launch, main.py or a built bot.pyz", default="main.py")
+    (options, args) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    turns = phase_lines(args[0] if args else sorted(glob.glob(GAMELOGS))[0])
+    indices = [str(index) for index in range(len(config.PORTS))]
+    setups = (("4 processes", [[sys.executable, options.bot, index] for index in indices]),
+              ("1 process", [[sys.executable, options.bot] + indices]))
+
+    results = {}
+    for name, commands in setups:
+        runs = [asyncio.run(measure(commands, turns)) for _ in range(options.rounds)]
+        startup, game, rss, hwm = [statistics.median(values) for values in zip(*runs)]
+        results[name] = (startup, rss)
+        logging.info("%-12s startup %7.1f ms  game %7.1f ms  rss %7.1f MiB  peak rss %7.1f MiB",
+                     name, startup * 1000, game * 1000, rss / 1024, hwm / 1024)
+
+    (startup4, rss4), (startup1, rss1) = results["4 processes"], results["1 process"]
+    logging.info("One process saves %.1f ms of startup (%.0f%%) and %.1f MiB of memory (%.0f%%)",
+                 (startup4 - startup1) * 1000, (1 - startup1 / startup4) * 100,
+                 (rss4 - rss1) / 1024, (1 - rss1 / rss4) * 100)
+
+
+if __name__ == '__main__':
+    main()
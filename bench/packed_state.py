@@ -0,0 +1,108 @@
+import logging
+from optparse import OptionParser
+import random
+import time
+
+from bench.decode import flatten
+from game.item import Item
+from game.position import BOARD, Position
+from simulator.packed_state import ITEMS, PackedState, hash_game_state, zobrist_hash
+from simulator.simulator import Simulator
+from strategy.strategy_config import STRATEGIES, isolated_strategy
+
+
+"""Turn the Simulator's decisions for a phase into PackedState's: cell indices for moves, ITEMS indices for purchases."""
+def pack_decisions(apply: str, decisions: list) -> list:
+    if apply == "apply_move":
+        return [d.index if isinstance(d, Position) and d.in_bounds else None for d in decisions]
+    if apply == "apply_buy":
+        return [ITEMS.index(d) if isinstance(d, Item) else None for d in decisions]
+    return decisions
+
+
+"""Replace the strategies' decisions with random ones, which reach rules the strategies never trigger."""
+def perturb(apply: str, decisions: list, rng: random.Random) -> list:
+    if apply == "apply_use":
+        return [True] * len(decisions)
+    if apply == "apply_move":
+        return [rng.choice(BOARD) for _ in decisions]
+    if apply == "apply_attack":
+        return [rng.randrange(4) for _ in decisions]
+    return [rng.choice(ITEMS) for _ in decisions]
+
+
+def check(condition: bool, game: int, turn: int, what: str) -> None:
+    if not condition:
+        raise AssertionError("PackedState disagrees with the Simulator in game %d, turn %d: %s" % (game, turn, what))
+
+
+"""Play games with the Simulator and a PackedState side by side and check they agree after every phase.
+
+Each phase the PackedState must equal the one packed from the Simulator, and its GameState must
+match the Simulator's snapshot. Its incrementally updated Zobrist hash must equal the hash computed
+from scratch, and hash_game_state of the snapshot whenever no item is in use, which a GameState
+cannot show. After the game the PackedState is undone one turn at a time back to its start,
+checking the hash at every step. A fraction of the phases get random decisions instead of the
+strategies'.
+
+:returns: the number of phases checked.
+"""
+def check_games(games: int, turns: int, random_phases: float, seed: int) -> int:
+    phases = 0
+    for game in range(games):
+        rng = random.Random(seed + game)
+        names = [rng.choice(sorted(STRATEGIES)) for _ in range(4)]
+        simulator = Simulator([isolated_strategy(STRATEGIES[name]) for name in names], turns)
+        state = PackedState.from_simulator(simulator)
+        start = state.key()
+        marks = []
+        while simulator.turn < simulator.turns:
+            marks.append(state.mark())
+            simulator.begin_turn()
+            state.begin_turn()
+            for method, apply in Simulator.PHASES:
+                decisions = simulator.decide(method, simulator.snapshot())
+                if rng.random() < random_phases:
+                    decisions = perturb(apply, decisions, rng)
+                getattr(simulator, apply)(decisions)
+                getattr(state, apply)(pack_decisions(apply, decisions))
+                check(state.key() == PackedState.from_simulator(simulator).key(), game, simulator.turn, apply)
+                check(flatten(state.to_game_state()) == flatten(simulator.snapshot()), game, simulator.turn,
+                      "to_game_state after " + apply)
+                check(state.hash == zobrist_hash(state.slots), game, simulator.turn, "hash after " + apply)
+                if all(item == Item.NONE for item in simulator.item_in_use):
+                    check(state.hash == hash_game_state(simulator.snapshot()), game, simulator.turn,
+                          "hash_game_state after " + apply)
+                phases += 1
+            simulator.end_turn()
+            state.end_turn()
+            check(state.key() == PackedState.from_simulator(simulator).key(), game, simulator.turn, "end_turn")
+        for turn, mark in reversed(list(enumerate(marks, 1))):
+            state.undo(mark)
+            check(state.hash == zobrist_hash(state.slots), game, turn, "hash after undoing the turn")
+        check(state.key() == start, game, simulator.turn, "undo to the start of the game")
+    return phases
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options]")
+    parser.add_option("--games", "-g", dest="games", type="int", help="Games to play", default=40)
+    parser.add_option("--turns", "-t", dest="turns", type="int", help="Turns per game", default=50)
+    parser.add_option("--random", "-r", dest="random", type="float", help="Fraction of phases with random decisions", default=0.3)
+    parser.add_option("--seed", dest="seed", type="int", help="Seed of the first game", default=0)
+    (options, _) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    start = time.perf_counter()
+    phases = check_games(options.games, options.turns, options.random, options.seed)
+    logging.info("PackedState matches the Simulator in all %d phases of %d games (%.1fs)",
+                 phases, options.games, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import glob
+import logging
+from optparse import OptionParser
+import time
+from typing import List
+
+import config
+from bench.decode import GAMELOGS, load_payloads
+from game.game_state_decoder import GameStateDecoder
+from simulator.packed_state import PackedState
+from simulator.simulator import Simulator
+from simulator.tournament import Running, wilson
+from strategy.search import ATTACK, MOVE, SearchStrategy
+from strategy.starter_strategy import StarterStrategy
+from strategy.strategy_config import isolated_strategy
+
+
+"""Every step-th recorded turn, packed, as roots for the search."""
+def sample_positions(paths: List[str], count: int) -> List[PackedState]:
+    payloads = load_payloads(paths)
+    step = max(1, len(payloads) // count)
+    # the decoder updates its GameState in place, which is fine as it is packed right away
+    decoder = GameStateDecoder()
+    return [PackedState.from_game_state(decoder.decode(payload)) for payload in payloads[::step][:count]]
+
+
+"""Search a MOVE and an ATTACK phase from every position and report how fast the tree grows."""
+def throughput(positions: List[PackedState], budget: float) -> dict:
+    strategy = SearchStrategy(budget=budget)
+    for state in positions:
+        for phase in (MOVE, ATTACK):
+            strategy.search(state, phase, state.turn % 4)
+    stats = strategy.stats
+    seconds = stats["seconds"]
+    return {"iterations/s": stats["iterations"] / seconds, "nodes/s": stats["nodes"] / seconds,
+            "plies/s": stats["plies"] / seconds, "iterations/search": stats["iterations"] / stats["searches"],
+            "table": strategy.table.report()}
+
+
+"""Play games with one searching seat against StarterStrategy, rotating the seat; a budget of 0 seats a StarterStrategy instead.
+
+:returns: the scores and win rate of the searching seat.
+"""
+def quality(budget: float, games: int, turns: int) -> (Running, float, int):
+    scores = Running()
+    wins = 0.0
+    if not budget:
+        # StarterStrategy is deterministic, so there is only one game per seat to play
+        games = min(games, 4)
+    for game in range(games):
+        seat = game % 4
+        strategies = [isolated_strategy(StarterStrategy) for _ in range(4)]
+        if budget:
+            strategies[seat] = SearchStrategy(budget=budget)
+        final = [p.score for p in Simulator(strategies, turns).run().player_state_list]
+        scores.add(final[seat])
+        if final[seat] == max(final):
+            wins += 1 / final.count(max(final))
+    return scores, wins, games
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options] [gamelog.json ...]")
+    parser.add_option("--budgets", "-b", dest="budgets", help="Search budgets per phase in milliseconds", default="1,5,20,50")
+    parser.add_option("--positions", "-p", dest="positions", type="int", help="Recorded positions to search", default=100)
+    parser.add_option("--games", "-g", dest="games", type="int", help="Games per budget, 0 to skip", default=8)
+    parser.add_option("--turns", "-t", dest="turns", type="int", help="Turns per game", default=config.TURNS)
+    (options, args) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    budgets = [float(budget) / 1000 for budget in options.budgets.split(",")]
+    positions = sample_positions(args or sorted(glob.glob(GAMELOGS)), options.positions)
+    for budget in budgets:
+        rates = throughput(positions, budget)
+        logging.info("%5.0fms: %7.0f iterations/s %7.0f nodes/s %8.0f plies/s, %6.0f iterations per search",
+                     budget * 1000, rates["iterations/s"], rates["nodes/s"], rates["plies/s"], rates["iterations/search"])
+        logging.info("       %s", rates["table"])
+
+    if not options.games:
+        return
+    for budget in [0.0] + budgets:
+        start = time.perf_counter()
+        scores, wins, games = quality(budget, options.games, options.turns)
+        low, high = wilson(wins, games)
+        logging.info("%-8s mean score %5.1f ±%4.1f, win rate %5.1f%% [%5.1f%%, %5.1f%%] over %d games in %.1fs",
+                     "%.0fms" % (budget * 1000) if budget else "starter", scores.mean, scores.interval(),
+                     wins / games * 100, low * 100, high * 100, games, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import logging
+from optparse import OptionParser
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+import zipapp
+
+import build
+import config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+"""The archive build.py used to write: the whole project root as sources, minus other archives."""
+def build_project_archive(target: str) -> None:
+    zipapp.create_archive(ROOT, target=target, main='main:main', filter=lambda path: path.suffix != ".pyz")
+
+
+"""Launch command and return the seconds until it connects to the engine's port.
+
+The connection is closed right away, which ends the bot. :returns: the seconds and the bot's stderr.
+"""
+def time_to_connect(command: List[str], port: int) -> (float, str):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('localhost', port))
+        server.listen(1)
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        connection, _ = server.accept()
+        elapsed = time.perf_counter() - start
+        connection.close()
+    _, errors = process.communicate()
+    return elapsed, errors
+
+
+"""Parse -X importtime output into (self us, cumulative us, depth, module) tuples, in import order."""
+def parse_importtime(errors: str) -> List[tuple]:
+    imports = []
+    for line in errors.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(own), int(cumulative), depth, name.strip()))
+    return imports
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options] [bot.pyz]\n\nWithout an archive, compares the build of build.py with zipping the whole project")
+    parser.add_option("--rounds", "-r", dest="rounds", type="int", help="Launches of each command", default=10)
+    parser.add_option("--top", "-n", dest="top", type="int", help="Modules listed in the import breakdown", default=15)
+    (options, args) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    port = config.PORTS[0]
+    with tempfile.TemporaryDirectory() as directory:
+        if args:
+            bots = [("bot", args[0])]
+        else:
+            bots = [("project", os.path.join(directory, "project.pyz")), ("build.py", os.path.join(directory, "bot.pyz"))]
+            build_project_archive(bots[0][1])
+            build.build(bots[1][1])
+
+        # an interpreter that does nothing but connect, the floor for any bot
+        commands = [("python", [sys.executable, "-c", "import socket; socket.create_connection(('localhost', %d))" % port])]
+        commands += [(name, [sys.executable, bot, "0"]) for name, bot in bots]
+        for name, command in commands:
+            times = [time_to_connect(command, port)[0] for _ in range(options.rounds)]
+            size = "%8.1f KiB" % (os.path.getsize(command[1]) / 1024) if command[1].endswith(".pyz") else ""
+            logging.info("%-8s %s start to connect: median %6.1f ms, min %6.1f ms, max %6.1f ms", name, size.rjust(12),
+                         statistics.median(times) * 1000, min(times) * 1000, max(times) * 1000)
+
+        _, errors = time_to_connect([sys.executable, "-X", "importtime", bots[-1][1], "0"], port)
+
+    imports = parse_importtime(errors)
+    top_level = [entry for entry in imports if entry[2] == 0]
+    logging.info("Imports: %d modules, %.1f ms in total", len(imports), sum(entry[1] for entry in top_level) / 1000)
+    logging.info("%-40s %10s %10s", "slowest top level imports", "self ms", "total ms")
+    for own, cumulative, _, name in sorted(top_level, key=lambda entry: -entry[1])[:options.top]:
+        logging.info("%-40s %10.2f %10.2f", name, own / 1000, cumulative / 1000)
+    logging.info("%-40s %10s %10s", "slowest modules", "self ms", "total ms")
+    for own, cumulative, depth, name in sorted(imports, key=lambda entry: -entry[0])[:options.top]:
+        logging.info("%-40s %10.2f %10.2f", "  " * depth + name, own / 1000, cumulative / 1000)
+
+
+if __name__ == '__main__':
+    main()
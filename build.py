@@ -1,4 +1,141 @@
-import zipapp
-print("Writing to bot.pyz...")
-zipapp.create_archive('.', main='main:main', target='bot.pyz')
-print("Done!")
\ No newline at end of file
+import ast
+import importlib.util
+import json
+from optparse import OptionParser
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY_MODULE = "main"
+ENTRY_FUNCTION = "main"
+# the same bootstrap zipapp writes for main='main:main'
+MAIN = "# -*- coding: utf-8 -*-\nimport %s\n%s.%s()\n" % (ENTRY_MODULE, ENTRY_MODULE, ENTRY_FUNCTION)
+# fixed timestamps so the same sources always give the same archive
+DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+"""Return the file of a project module, the __init__.py of a package, or None if it is not part of the project."""
+def module_path(name: str) -> str:
+    base = os.path.join(ROOT, *name.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def is_project_module(name: str) -> bool:
+    top = name.split(".")[0]
+    return os.path.isfile(os.path.join(ROOT, top + ".py")) or os.path.isdir(os.path.join(ROOT, top))
+
+
+"""Every module name a source file may import, including imports inside functions."""
+def imported_names(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+            # from package import module
+            names.extend(node.module + "." + alias.name for alias in node.names)
+    return names
+
+
+"""Follow the imports from the entry module.
+
+:returns: the project modules reachable from it mapped to their files, and the top level names of
+    every other module they import (standard library and third party).
+"""
+def reachable_modules(entry: str = ENTRY_MODULE) -> (dict, set):
+    modules = {}
+    external = set()
+    pending = [entry]
+    while pending:
+        name = pending.pop()
+        if name in modules:
+            continue
+        if not is_project_module(name):
+            external.add(name.split(".")[0])
+            continue
+        path = module_path(name)
+        if path is None:
+            # a name imported from a module, or a namespace package such as util
+            continue
+        modules[name] = path
+        parts = name.split(".")
+        pending.extend(".".join(parts[:i]) for i in range(1, len(parts)))
+        pending.extend(imported_names(path))
+    return modules, external
+
+
+def archive_name(path: str) -> str:
+    return os.path.relpath(path, ROOT).replace(os.sep, "/")
+
+
+"""Write the bot archive with every module reachable from main:main and its precompiled bytecode.
+
+The bytecode uses unchecked hash based .pyc files, which zipimport loads without looking at the
+source. A .pyc built by another Python version is skipped by zipimport, which then compiles the
+source instead, unless the sources were left out.
+
+:returns: the manifest stored in the archive.
+"""
+def build(target: str, include_source: bool = True, compress: bool = False) -> dict:
+    modules, external = reachable_modules()
+    manifest = {
+        "entry": ENTRY_MODULE + ":" + ENTRY_FUNCTION,
+        "python": "%d.%d.%d" % sys.version_info[:3],
+        "magic": importlib.util.MAGIC_NUMBER.hex(),
+        "modules": sorted(modules),
+        "external": sorted(external),
+    }
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+    def add(archive, name, data):
+        info = zipfile.ZipInfo(name, date_time=DATE_TIME)
+        info.compress_type = compression
+        archive.writestr(info, data)
+
+    with tempfile.TemporaryDirectory() as directory, zipfile.ZipFile(target, "w") as archive:
+        add(archive, "__main__.py", MAIN)
+        # zipimport only finds namespace packages such as util through an entry for their directory
+        for directory_name in sorted({archive_name(os.path.dirname(path)) for path in modules.values()} - {"."}):
+            info = zipfile.ZipInfo(directory_name + "/", date_time=DATE_TIME)
+            info.external_attr = 0o40755 << 16 | 0x10
+            archive.writestr(info, b"")
+        for name in sorted(modules):
+            path = modules[name]
+            source_name = archive_name(path)
+            bytecode = os.path.join(directory, name + ".pyc")
+            py_compile.compile(path, cfile=bytecode, dfile=source_name, doraise=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+            with open(bytecode, "rb") as f:
+                add(archive, source_name + "c", f.read())
+            if include_source:
+                with open(path, "rb") as f:
+                    add(archive, source_name, f.read())
+        add(archive, "manifest.json", json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option("--output", "-o", dest="output", help="Archive to write", default="bot.pyz")
+    parser.add_option("--no-source", dest="source", action="store_false", help="Ship the bytecode only", default=True)
+    parser.add_option("--compress", dest="compress", action="store_true", help="Deflate the archive", default=False)
+    (options, _) = parser.parse_args()
+
+    print("Writing to " + options.output + "...")
+    manifest = build(options.output, options.source, options.compress)
+    print("Packaged %d modules, %.1f KiB" % (len(manifest["modules"]), os.path.getsize(options.output) / 1024))
+    print("Runtime imports outside the archive: " + ", ".join(manifest["external"]))
+    print("Done!")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,3 +8,6 @@ class CharacterClass(Enum):
   WIZARD = StatSet(6, 5, 3, 2)
   ARCHER = StatSet(3, 3, 4, 3)
 
+  # members are pickled by name, their StatSet values do not compare equal once copied
+  def __reduce_ex__(self, protocol):
+    return getattr, (self.__class__, self.name)
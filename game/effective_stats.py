@@ -0,0 +1,60 @@
+from game.character_class import CharacterClass
+from game.item import Item
+from game.stat_set import StatSet
+
+
+"""The stats of a class holding item while in_use is in effect, by the game's rules.
+
+A held item only adds its modifiers if it is passive; a consumable (a potion, the shield) adds
+them from when it is used until its effect runs out. Everything that combines stats, the
+Simulator and PackedState included, goes through this function.
+"""
+def combined_stat_set(character_class: CharacterClass, item: Item, in_use: Item = Item.NONE) -> StatSet:
+    held = item.value.stat_set if item.value.item_timer == -1 else Item.NONE.value.stat_set
+    return character_class.value.plus(held).plus(in_use.value.stat_set)
+
+
+class EffectiveStats:
+    """Read-only stats of a class holding an item, as combined_stat_set counts them with nothing in use.
+
+    Bots are not told which consumable is in effect, so a potion only counts once the engine's
+    GameState shows it was used, not while it is held.
+
+    There are only a few dozen class and item combinations, so every view is built once at import and
+    shared by all players; look them up with effective_stats or PlayerState.effective_stats. Copying
+    a view returns the view itself and unpickling one looks up the shared view.
+    """
+    __slots__ = ('character_class', 'item', 'max_health', 'damage', 'speed', 'range')
+
+    def __init__(self, character_class: CharacterClass, item: Item) -> None:
+        stat_set = combined_stat_set(character_class, item)
+        object.__setattr__(self, 'character_class', character_class)
+        object.__setattr__(self, 'item', item)
+        object.__setattr__(self, 'max_health', stat_set.max_health)
+        object.__setattr__(self, 'damage', stat_set.damage)
+        object.__setattr__(self, 'speed', stat_set.speed)
+        object.__setattr__(self, 'range', stat_set.range)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EffectiveStats is read-only")
+
+    def __copy__(self) -> 'EffectiveStats':
+        return self
+
+    def __deepcopy__(self, memo) -> 'EffectiveStats':
+        return self
+
+    def __reduce__(self):
+        return (effective_stats, (self.character_class, self.item))
+
+    def __repr__(self) -> str:
+        return "EffectiveStats(max_health=%d, damage=%d, speed=%d, range=%d)" % (
+            self.max_health, self.damage, self.speed, self.range)
+
+
+EFFECTIVE_STATS = {(character_class, item): EffectiveStats(character_class, item)
+                   for character_class in CharacterClass for item in Item}
+
+
+def effective_stats(character_class: CharacterClass, item: Item) -> EffectiveStats:
+    return EFFECTIVE_STATS[(character_class, item)]
@@ -0,0 +1,87 @@
+import json
+
+from game.character_class import CharacterClass
+from game.game_state import GameState
+from game.item import Item
+from game.player_state import PlayerState
+from game.position import Position
+from game.stat_set import StatSet
+
+CHARACTER_CLASSES = {character_class.name: character_class for character_class in CharacterClass}
+ITEMS = {item.name: item for item in Item}
+
+
+class GameStateDecoder:
+    """Decoder for the engine's fixed game state schema.
+
+    The decoder keeps the GameState it returned last time and updates its PlayerStates in place.
+    Positions are interned and StatSet objects are only replaced when their values change, neither
+    is ever mutated, so references a strategy keeps to them stay valid across turns.
+
+    When the engine resends exactly the line it sent before, the previous GameState is returned
+    without decoding. Comparing against the last line is a single memcmp, which is cheaper than
+    hashing it. The number of new and repeated lines is counted per caller supplied key (the phase).
+    """
+
+    def __init__(self) -> None:
+        self.game_state = None
+        self.last_data = None
+        self.stats = {}
+
+    def decode(self, data: str, key=None) -> GameState:
+        counts = self.stats.get(key)
+        if counts is None:
+            counts = self.stats[key] = [0, 0]
+        if self.game_state is not None and data == self.last_data:
+            counts[1] += 1
+            return self.game_state
+        counts[0] += 1
+        game_state = self.decode_dict(json.loads(data))
+        self.last_data = data
+        return game_state
+
+    """Leave the last GameState to whoever still reads it, such as a strategy still deciding on another
+    thread: the next decode builds a new GameState instead of updating that one."""
+    def detach(self) -> None:
+        self.game_state = None
+        self.last_data = None
+
+    """Describe how many of the lines seen for each key were new and how many were repeats."""
+    def report(self) -> str:
+        return ", ".join("%s: %d new / %d repeated" % (getattr(key, "name", key), new, repeated)
+                         for key, (new, repeated) in self.stats.items())
+
+    def decode_dict(self, gamestate_dict: dict) -> GameState:
+        self.last_data = None
+        player_state_dicts = gamestate_dict['player_states']
+        game_state = self.game_state
+        if game_state is None or len(game_state.player_state_list) != len(player_state_dicts):
+            game_state = GameState(turn=0, player_state_list=[PlayerState() for _ in player_state_dicts])
+            self.game_state = game_state
+        game_state.turn = gamestate_dict['turn']
+
+        for player_state, player_state_dict in zip(game_state.player_state_list, player_state_dicts):
+            character_class = CHARACTER_CLASSES[player_state_dict['class']]
+            item = ITEMS[player_state_dict['item']]
+            if character_class is not player_state.character_class or item is not player_state.item:
+                player_state.character_class = character_class
+                player_state.item = item
+                player_state.update_effective_stats()
+            player_state.gold = player_state_dict['gold']
+            player_state.score = player_state_dict['score']
+            player_state.health = player_state_dict['health']
+
+            position_dict = player_state_dict['position']
+            player_state.position = Position(position_dict['x'], position_dict['y'])
+
+            stat_set_dict = player_state_dict['stat_set']
+            max_health = stat_set_dict['maxHealth']
+            damage = stat_set_dict['damage']
+            speed = stat_set_dict['speed']
+            range = stat_set_dict['range']
+            stat_set = player_state.stat_set
+            if stat_set.max_health != max_health or stat_set.damage != damage or stat_set.speed != speed \
+                    or stat_set.range != range:
+                player_state.stat_set = StatSet(max_health=max_health, damage=damage, speed=speed, range=range)
+
+        return game_state
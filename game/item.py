@@ -21,3 +21,6 @@ class Item(Enum):
     DEXTERITY_POTION = ItemModel(StatSet(0, 0, 0, 2), 1, 5)
     NONE = ItemModel(StatSet(0, 0, 0, 0), -1, 100)
 
+    # members are pickled by name, their ItemModel values do not compare equal once copied
+    def __reduce_ex__(self, protocol):
+        return getattr, (self.__class__, self.name)
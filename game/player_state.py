@@ -1,4 +1,5 @@
 from game.character_class import CharacterClass
+from game.effective_stats import EFFECTIVE_STATS, EffectiveStats
 from game.item import Item
 from game.position import Position
 from game.stat_set import StatSet
@@ -14,6 +15,8 @@ class PlayerState:
     self.score = 0
     self.health = 0
     self.stat_set = StatSet()
+    # class stats combined with the held item's modifiers, shared from a prebuilt table
+    self.effective_stats: EffectiveStats = EFFECTIVE_STATS[(self.character_class, self.item)]
   def getScore(self):
     return self.score
 
@@ -21,4 +24,8 @@ class PlayerState:
     return self.position
 
   def getStatSet(self):
-    return self.stat_set
\ No newline at end of file
+    return self.stat_set
+
+  # call after changing character_class or item so effective_stats matches them again
+  def update_effective_stats(self) -> None:
+    self.effective_stats = EFFECTIVE_STATS[(self.character_class, self.item)]
\ No newline at end of file
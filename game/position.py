@@ -1,14 +1,69 @@
+import config
 
 
 class Position:
-    x = 0
-    y = 0
-    def __init__(self, x:int=0, y:int=0) -> None:
-        self.x = x
-        self.y = y
+    """An immutable board coordinate.
+
+    Every cell of the config.BOARD_SIZE board is interned, so Position(x, y) for an on-board cell
+    always returns the same object and never allocates. Positions compare and hash by value, and
+    each one carries its cell index (x * BOARD_SIZE + y, -1 when off the board), whether it is in
+    bounds and the tuple of its orthogonal on-board neighbors.
+    """
+    __slots__ = ('x', 'y', 'index', 'in_bounds', 'neighbors', '_hash')
+
+    def __new__(cls, x: int = 0, y: int = 0) -> 'Position':
+        try:
+            if x >= 0 and y >= 0:
+                return _GRID[x][y]
+        except (IndexError, TypeError):
+            pass
+        return cls._create(x, y, -1)
+
+    @classmethod
+    def _create(cls, x: int, y: int, index: int) -> 'Position':
+        position = object.__new__(cls)
+        object.__setattr__(position, 'x', x)
+        object.__setattr__(position, 'y', y)
+        object.__setattr__(position, 'index', index)
+        object.__setattr__(position, 'in_bounds', index >= 0)
+        object.__setattr__(position, 'neighbors', ())
+        object.__setattr__(position, '_hash', hash((x, y)))
+        return position
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Position):
+            return self.x == other.x and self.y == other.y
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return (Position, (self.x, self.y))
+
+    def __repr__(self) -> str:
+        return "Position(%r, %r)" % (self.x, self.y)
 
     def getX(self):
         return self.x
 
     def getY(self):
-        return self.y
\ No newline at end of file
+        return self.y
+
+
+# every on-board cell, looked up by index
+BOARD = tuple(Position._create(x, y, x * config.BOARD_SIZE + y)
+              for x in range(config.BOARD_SIZE) for y in range(config.BOARD_SIZE))
+# the same cells looked up by _GRID[x][y]
+_GRID = [BOARD[x * config.BOARD_SIZE:(x + 1) * config.BOARD_SIZE] for x in range(config.BOARD_SIZE)]
+
+for _position in BOARD:
+    object.__setattr__(_position, 'neighbors', tuple(
+        _GRID[_position.x + dx][_position.y + dy] for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+        if 0 <= _position.x + dx < config.BOARD_SIZE and 0 <= _position.y + dy < config.BOARD_SIZE))
+del _position
@@ -12,4 +12,4 @@ class StatSet(object):
         return self.range
 
     def plus(self, other):
-        return StatSet(self.max_health + other.maxHealth, self.damage + other.damage, self.speed + other.speed, self.range + other.range)
+        return StatSet(self.max_health + other.max_health, self.damage + other.damage, self.speed + other.speed, self.range + other.range)
@@ -2,16 +2,16 @@ from enum import Enum, auto
 import json
 import logging
 from optparse import OptionParser
-import sys
+import time
 
 
-import jsonpickle
-from pip import main
+from action.action import Action
 from action.attack_action import AttackAction
 from action.buy_action import BuyAction
 from action.move_action import MoveAction
 from action.use_action import UseAction
 from game.game_state import GameState
+from game.game_state_decoder import GameStateDecoder
 from networking.client import Client
 from networking.comm_state import CommState
 from game.character_class import CharacterClass
@@ -20,7 +20,9 @@ from game.player_state import PlayerState
 from game.position import Position
 from game.stat_set import StatSet
 import config
-from strategy.strategy_config import get_strategy
+from strategy.anytime import AnytimeRunner, fallback_attack, fallback_buy, fallback_move, fallback_use
+from strategy.pipeline import SpeculativePipeline
+from strategy.strategy import Strategy
 
 class Phase(Enum):
     USE = auto()
@@ -32,9 +34,18 @@ class Phase(Enum):
 
 def main():
 
-  parser = OptionParser()
+  parser = OptionParser(usage="%prog PLAYER_INDEX [PLAYER_INDEX ...] [options]")
   parser.add_option("--debug", "-d", dest="debug", action="store_true", help="Turn on debug mode", default=False)
-  (options, _) = parser.parse_args()
+  parser.add_option("--profile", dest="profile", help="Run cProfile over the phases and turns in PROFILE, e.g. MOVE,ATTACK,10-20 or all", default=None)
+  parser.add_option("--profile-out", dest="profile_out", help="Where --profile saves its stats for pstats or snakeviz", default="profile.pstats")
+  parser.add_option("--record", dest="record", help="Record every line exchanged with the engine to this session file", default=None)
+  parser.add_option("--replay", dest="replay", help="Play the bot against a recorded session file instead of the engine", default=None)
+  parser.add_option("--timings", dest="timings", help="Time every stage of every phase and save the histograms to this JSON file", default=None)
+  parser.add_option("--pipeline", dest="pipeline", action="store_true", help="Compute MOVE and ATTACK speculatively while waiting for the engine", default=False)
+  parser.add_option("--deadline", dest="deadline", type="float", help="Answer every phase within this many milliseconds, sending the strategy's best answer so far or a safe fallback", default=None)
+  parser.add_option("--asyncio", dest="asyncio", action="store_true", help="Talk to the engine with the asyncio client, which reconnects quickly while the engine starts", default=False)
+  parser.add_option("--timeout", dest="timeout", type="float", help="With --asyncio or several players, give up when the engine sends nothing for this many seconds", default=None)
+  (options, args) = parser.parse_args()
 
   if options.debug == True:
     logging.basicConfig(    
@@ -51,95 +62,293 @@ def main():
 
   logging.info("Welcome to Mechmania 28 Python bot!")
 
-  player_index = -1
-  if len(sys.argv) >= 2 and sys.argv[1].isdigit() and int(sys.argv[1]) >= 0 and int(sys.argv[1]) < 4:
-    player_index = int(sys.argv[1])
-  else:
+  player_indices = [int(arg) for arg in args if arg.isdigit() and int(arg) >= 0 and int(arg) < 4]
+  if not args or len(player_indices) != len(args) or len(set(player_indices)) != len(player_indices):
     logging.warn("Invalid or empty player number. Please specify a valid player number.")
     return
 
-  strategy = get_strategy(player_index=player_index)
+  # bots sharing the process must not share the strategies' module level state
+  isolated = len(player_indices) > 1
+  builders = [lambda player_index=player_index: make_bot(player_index, options, isolated) for player_index in player_indices]
+
+  if options.replay:
+    if len(player_indices) > 1:
+      logging.warn("A session can only be replayed for one player.")
+      return
+    from networking.session import ReplayClient
+    bots = [play(ReplayClient(options.replay), builders[0])]
+  elif options.asyncio or len(player_indices) > 1:
+    import asyncio
+    from networking.async_client import AsyncClient
+    clients = [AsyncClient(config.PORTS[player_index], read_timeout=options.timeout) for player_index in player_indices]
+    if options.record:
+      record(clients, options.record)
+    try:
+      bots = asyncio.run(play_all(clients, builders, len(clients) > 1))
+    except asyncio.TimeoutError:
+      logging.warning("Timed out waiting for the engine")
+      return
+  else:
+    client = Client(config.PORTS[player_indices[0]])
+    if options.record:
+      record([client], options.record)
+    bots = [play(client, builders[0])]
+
+  if options.timings:
+    from util.timing import dump_report
+    dump_report(options.timings, {str(bot.player_index): bot.timings.report() for bot in bots})
+    logging.info("Saved stage timings to " + options.timings)
+  for bot in bots:
+    if bot.profiler is not None and bot.profiler.profiled:
+      bot.profiler.dump(options.profile_out if len(bots) == 1 else "%s.%d" % (options.profile_out, bot.player_index))
+      logging.info("Profiled %d phases:\n%s", bot.profiler.profiled, bot.profiler.summary())
+
+  if all(bot.completed for bot in bots):
+    logging.info("Completed!. Check your output at Engine\\gamelogs.")
 
+""" record the session of every client, to path itself for a single client or to path.<port> for several."""
+def record(clients: list, path: str) -> None:
+  from networking.session import SessionRecorder
+  for client in clients:
+    client.recorder = SessionRecorder(path if len(clients) == 1 else "%s.%d" % (path, client.port_number), client.port_number)
 
-  client = Client(config.PORTS[player_index])
+""" build the bot for one player. Called once connected: the strategies build their tables on import, which
+then overlaps with the engine waiting for the other bots instead of delaying the connection."""
+def make_bot(player_index: int, options, isolated: bool) -> "Bot":
+  from strategy.strategy_config import get_isolated_strategy, get_strategy
+  strategy = get_isolated_strategy(player_index) if isolated else get_strategy(player_index=player_index)
+  runner = AnytimeRunner(strategy, options.deadline / 1000) if options.deadline else None
+  pipeline = SpeculativePipeline(strategy) if options.pipeline else None
+  bot = Bot(strategy, runner, pipeline)
+  if options.timings or options.profile:
+    from util.timing import PhaseProfiler, StageTimings
+    bot.timings = StageTimings() if options.timings else None
+    bot.profiler = PhaseProfiler(options.profile) if options.profile else None
+  return bot
 
+""" connect to the engine over a blocking Client, then build the bot and run it until the game is over."""
+def play(client: Client, build) -> "Bot":
   client.connect()
+  logging.info("Connected to Engine. Setting up for game...")
+  bot = build()
+  logging.info("Waiting for wake...")
+  while not bot.finished:
+    started = time.perf_counter_ns()
+    data = client.read()
+    received = time.perf_counter_ns()
+    reply = bot.receive(data, received / 1e9)
+    if reply is not None:
+      replying = time.perf_counter_ns()
+      client.write(reply)
+      written = time.perf_counter_ns()
+      bot.record_io(received - started, written - replying, written - received)
+      bot.sent()
+  client.disconnect()
+  return bot
+
+""" serve several players from this process, each bot on its own connection. With threaded set every bot
+decides on an executor thread, so one bot's strategy never holds up another reading its line."""
+async def play_all(clients: list, builders: list, threaded: bool = False) -> list:
+  import asyncio
+  return await asyncio.gather(*[play_async(client, build, threaded) for client, build in zip(clients, builders)])
 
+""" the same loop as play as a coroutine, over an AsyncClient."""
+async def play_async(client, build, threaded: bool = False) -> "Bot":
+  import asyncio
+  loop = asyncio.get_running_loop()
+  await client.connect()
   logging.info("Connected to Engine. Setting up for game...")
-  comm_state = CommState.START
+  bot = build()
+  logging.info("Waiting for wake...")
+  try:
+    while not bot.finished:
+      started = time.perf_counter_ns()
+      data = await client.read()
+      received = time.perf_counter_ns()
+      if threaded:
+        reply = await loop.run_in_executor(None, bot.receive, data, received / 1e9)
+      else:
+        reply = bot.receive(data, received / 1e9)
+      if reply is not None:
+        replying = time.perf_counter_ns()
+        await client.write(reply)
+        written = time.perf_counter_ns()
+        bot.record_io(received - started, written - replying, written - received)
+        bot.sent()
+  finally:
+    await client.disconnect()
+  return bot
+
+class Bot:
+  """One player's side of the engine protocol, without any I/O.
+
+  Every line read from the engine goes to receive(), which returns the line to send back, if any.
+  sent() must be called once that line is written, so work that must not delay the reply (the
+  speculative pipeline) starts only then. finished is set once the engine sends fin, or when a
+  line cannot be decoded, in which case completed stays False.
+
+  With timings set, every phase records how long decoding, the strategy and encoding the action
+  took, and the loop adds reading and writing through record_io; answers the pipeline speculated
+  are recorded under "speculated" instead of "strategy". With a profiler set, the strategy calls of
+  the phases it selects run under cProfile, on whichever thread runs them.
+  """
 
-  while comm_state != CommState.END:
-    logging.debug((comm_state, comm_state==CommState.START))
+  timings = None
+  profiler = None
 
-    if comm_state == CommState.START:
-      logging.info("Waiting for wake...")
-      data = client.read()
+  def __init__(self, strategy: Strategy, runner: AnytimeRunner = None, pipeline: SpeculativePipeline = None) -> None:
+    self.strategy = strategy
+    self.runner = runner
+    self.pipeline = pipeline
+    self.comm_state = CommState.START
+    self.phase = Phase.USE
+    self.decoder = GameStateDecoder()
+    self.player_index = -1
+    self.game_state = None
+    # the phase whose reply receive() returned last, None during the handshake
+    self.handled = None
+    self.received = None
+    # whether the current phase runs under the profiler and whether its answer came from the pipeline
+    self.profiling = False
+    self.speculated = False
+    self.finished = False
+    self.completed = False
+
+  """ handle one line from the engine, read at the time.perf_counter() received, and return the reply if any.
+  The anytime runner's deadline counts from received, or from the call when it is not given."""
+  def receive(self, data: str, received: float = None) -> str:
+    logging.debug((self.comm_state, self.comm_state==CommState.START))
+    self.handled = None
+    self.received = received
+
+    if not data:
+      logging.warning("The engine closed the connection")
+      self.comm_state = CommState.END
+      self.finished = True
+      return None
+
+    if self.comm_state == CommState.START:
       if (data.startswith("wake")):
-        comm_state = CommState.NUM_ASSIGN
-        continue
-      continue
-    
-    if comm_state == CommState.NUM_ASSIGN:
-      read = client.read()
-      player_index = int(read)
-      logging.info(("Received player index", player_index))
-      comm_state = CommState.CLASS_REPORT
-      continue
+        self.comm_state = CommState.NUM_ASSIGN
+      return None
 
-    if comm_state == CommState.CLASS_REPORT:
-      character_class = strategy.strategy_initialize(player_index)
-      client.write(jsonpickle.encode(character_class.name))
-      comm_state = CommState.END
+    if self.comm_state == CommState.NUM_ASSIGN:
+      self.player_index = int(data)
+      logging.info(("Received player index", self.player_index))
+      self.comm_state = CommState.CLASS_REPORT
 
-  logging.info("Finished setup. Running game...")
+    if self.comm_state == CommState.CLASS_REPORT:
+      character_class = self.strategy.strategy_initialize(self.player_index)
+      self.comm_state = CommState.IN_GAME
+      logging.info("Finished setup. Running game...")
+      return json.dumps(character_class.name)
 
-  phase = Phase.USE 
-  while(True):
+    if self.pipeline is not None:
+      # the speculation reads the GameState the decoder is about to update
+      self.pipeline.wait()
 
-    data = client.read()
-    
     if (data.startswith("fin")) :
-      break
-    
+      self.finish()
+      return None
+
+    phase = self.phase
+    started = time.perf_counter_ns()
     game_state = None
-    
+
+    if self.runner is not None and self.runner.busy():
+      # a late decision still reads the last GameState, which the decoder would otherwise update in place
+      self.decoder.detach()
     try:
-      game_state = parse_json_as_game_state(data)
+      game_state = self.decoder.decode(data, phase)
     except json.JSONDecodeError as e:
       logging.warn(e)
-    
+
     if game_state is None:
-      return
+      self.comm_state = CommState.END
+      self.finished = True
+      return None
+    self.game_state = game_state
+    self.handled = phase
 
+    decoded = time.perf_counter_ns()
+    self.profiling = self.profiler is not None and self.profiler.wants(phase.name, game_state.turn)
+    self.speculated = False
+    action = self.act(phase, game_state)
+    decided = time.perf_counter_ns()
+    reply = action.to_json()
+
+    if self.timings is not None:
+      encoded = time.perf_counter_ns()
+      self.timings.record(phase.name, "decode", decoded - started)
+      # a speculative answer was computed while waiting for the engine, taking it only costs the lookup
+      self.timings.record(phase.name, "speculated" if self.speculated else "strategy", decided - decoded)
+      self.timings.record(phase.name, "encode", encoded - decided)
     if phase == Phase.USE :
       logging.info("Turn: " + str(game_state.turn))
-      use_action = UseAction(player_index, strategy.use_action_decision(game_state, player_index))
-      logging.debug(jsonpickle.encode(use_action))
-      client.write(jsonpickle.encode(use_action, unpicklable=False))
-      phase = Phase.MOVE
-      continue
+    return reply
+
+  """ ask the strategy, through the pipeline or the anytime runner if there are any, for this phase's action."""
+  def act(self, phase: Phase, game_state: GameState) -> Action:
+    strategy = self.strategy
+    player_index = self.player_index
+    if phase == Phase.USE :
+      self.phase = Phase.MOVE
+      return UseAction(player_index, self.decide(strategy.use_action_decision, game_state, fallback_use))
     if phase == Phase.MOVE :
-      move_action = MoveAction(player_index, strategy.move_action_decision(game_state, player_index))
-      client.write(jsonpickle.encode(move_action, unpicklable=False))
-      phase = Phase.ATTACK
-      continue
+      self.phase = Phase.ATTACK
+      return MoveAction(player_index, self.decide(strategy.move_action_decision, game_state, fallback_move))
     if phase == Phase.ATTACK :
-      attack_action = AttackAction(player_index, strategy.attack_action_decision(game_state, player_index))
-      client.write(jsonpickle.encode(attack_action, unpicklable=False))
-      phase = Phase.BUY
-      continue
-    if phase == Phase.BUY :
-      buy_action = BuyAction(player_index, strategy.buy_action_decision(game_state, player_index))
-      client.write(jsonpickle.encode(buy_action, unpicklable=False))
-      phase = Phase.USE
-      
-  client.disconnect()
-  logging.info("Completed!. Check your output at Engine\\gamelogs.")
+      self.phase = Phase.BUY
+      return AttackAction(player_index, self.decide(strategy.attack_action_decision, game_state, fallback_attack))
+    self.phase = Phase.USE
+    return BuyAction(player_index, self.decide(strategy.buy_action_decision, game_state, fallback_buy))
+
+  """ record how long the loop took to read the last line and write its reply, and the turnaround from
+  having the line to having sent the reply."""
+  def record_io(self, read_ns: int, write_ns: int, turnaround_ns: int) -> None:
+    if self.timings is None or self.handled is None:
+      return
+    self.timings.record(self.handled.name, "read", read_ns)
+    self.timings.record(self.handled.name, "write", write_ns)
+    self.timings.record(self.handled.name, "turnaround", turnaround_ns)
+
+  def sent(self) -> None:
+    # the USE answer just went out, so the engine is busy with the other bots for a while
+    if self.phase == Phase.MOVE and self.pipeline is not None and (self.runner is None or not self.runner.busy()):
+      turn = self.game_state.turn
+      profilers = tuple(self.profiler if self.profiler is not None and self.profiler.wants(phase, turn) else None
+                        for phase in ("MOVE", "ATTACK"))
+      self.pipeline.speculate(self.game_state, self.player_index, profilers)
+
+  def finish(self) -> None:
+    self.comm_state = CommState.END
+    self.finished = True
+    self.completed = True
+    logging.info("Decoded states per phase: " + self.decoder.report())
+    if self.pipeline is not None:
+      logging.info("Speculative decisions: " + self.pipeline.report())
+
+  """ use the pipeline's speculative answer when it still applies, otherwise call the strategy phase method
+  directly, or under the anytime runner's deadline when one is set."""
+  def decide(self, method, game_state: GameState, fallback):
+    if self.pipeline is not None:
+      hit, result = self.pipeline.take(method, game_state)
+      if hit:
+        self.speculated = True
+        return result
+    profiler = self.profiler if self.profiling else None
+    if self.runner is not None:
+      return self.runner.decide(method, game_state, self.player_index, fallback, profiler, self.received)
+    if profiler is not None:
+      return profiler.runcall(method, game_state, self.player_index)
+    return method(game_state, self.player_index)
 
 """ parse json string into a GameState Object."""
 def parse_json_as_game_state(data: str) -> GameState:
-  gamestate_dict = json.loads(data)
+  return parse_dict_as_game_state(json.loads(data))
 
+""" build a GameState Object from an already decoded json dict."""
+def parse_dict_as_game_state(gamestate_dict: dict) -> GameState:
   player_state_list = []
   for player_state_dict in gamestate_dict['player_states']:
     player_state = PlayerState()
@@ -154,6 +363,7 @@ def parse_json_as_game_state(data: str) -> GameState:
     player_state.health = player_state_dict['health']
 
     player_state.item = Item[player_state_dict['item']]
+    player_state.update_effective_stats()
 
     stat_set_dict = player_state_dict['stat_set']
     stat_set = StatSet(
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+
+class AsyncClient:
+  """asyncio counterpart of Client with the same read/write/disconnect semantics.
+
+  read() returns the next line including its newline, or "" once the engine closed the connection.
+  connect() retries on the RECONNECT_DELAYS schedule, staying on the last delay, until it succeeds
+  or connect_timeout runs out. Every operation raises asyncio.TimeoutError when its timeout runs
+  out; a timeout of None waits forever.
+  """
+
+  # seconds to wait after each failed attempt, short at first since the engine usually comes up quickly
+  RECONNECT_DELAYS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+  # game states are a single line, well above asyncio's default 64 KiB line limit is plenty
+  LINE_LIMIT = 1 << 20
+
+  def __init__(self, port_number:int, host:str = 'localhost', connect_timeout:float = None,
+               attempt_timeout:float = 1.0, read_timeout:float = None, write_timeout:float = 5.0) -> None:
+    self.port_number = port_number
+    self.host = host
+    self.connect_timeout = connect_timeout
+    self.attempt_timeout = attempt_timeout
+    self.read_timeout = read_timeout
+    self.write_timeout = write_timeout
+    self.reader = None
+    self.writer = None
+    self.connected = False
+    # a SessionRecorder that gets every line read and written, if the session is being recorded
+    self.recorder = None
+
+  async def connect(self):
+    loop = asyncio.get_running_loop()
+    deadline = None if self.connect_timeout is None else loop.time() + self.connect_timeout
+    attempt = 0
+    while (not self.connected):
+      timeout = self.attempt_timeout
+      if deadline is not None:
+        timeout = deadline - loop.time() if timeout is None else min(timeout, deadline - loop.time())
+        if timeout <= 0:
+          raise asyncio.TimeoutError("Could not connect to engine on port " + str(self.port_number))
+      try:
+        self.reader, self.writer = await asyncio.wait_for(
+          asyncio.open_connection(self.host, self.port_number, limit=self.LINE_LIMIT), timeout)
+        self.connected = True
+      except (OSError, asyncio.TimeoutError):
+        delay = self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)]
+        attempt += 1
+        logging.debug("Connect to engine failed, retrying in " + str(delay) + "s...")
+        await asyncio.sleep(delay)
+    if attempt:
+      logging.info("Connected to engine after " + str(attempt) + " failed attempts")
+
+  async def read(self) -> str:
+    message = (await asyncio.wait_for(self.reader.readline(), self.read_timeout)).decode()
+    logging.debug("Received message " + message)
+    if self.recorder is not None:
+      self.recorder.received(message)
+    return message
+
+  async def write(self, message:str) -> None:
+    logging.debug("Sending message \"" + message + "\"")
+    if self.recorder is not None:
+      self.recorder.sent(message)
+    self.writer.write(str.encode(message + "\n"))
+    await asyncio.wait_for(self.writer.drain(), self.write_timeout)
+
+  async def disconnect(self):
+    if self.recorder is not None:
+      self.recorder.close()
+    if self.writer is not None:
+      self.writer.close()
+      try:
+        await asyncio.wait_for(self.writer.wait_closed(), self.write_timeout)
+      except (OSError, asyncio.TimeoutError):
+        pass
+    self.reader = None
+    self.writer = None
+    self.connected = False
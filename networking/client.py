@@ -8,6 +8,8 @@ class Client:
     self.port_number = port_number
     self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     self.connected = False
+    # a SessionRecorder that gets every line read and written, if the session is being recorded
+    self.recorder = None
 
   def connect(self):
     while (not self.connected):
@@ -24,13 +26,19 @@ class Client:
   def read(self) -> str:
     message = self.socketfile.readline()
     logging.debug("Received message " + message)
+    if self.recorder is not None:
+      self.recorder.received(message)
     return message
 
   def write(self, message:str) -> None:
     logging.debug("Sending message \"" + message + "\"")
+    if self.recorder is not None:
+      self.recorder.sent(message)
     self.socket.sendall(str.encode(message + "\n"))
 
   def disconnect(self):
+    if self.recorder is not None:
+      self.recorder.close()
     self.socketfile.close()
     self.socket.close()
     self.connected = False
\ No newline at end of file
@@ -0,0 +1,88 @@
+import gzip
+import json
+import logging
+import time
+
+# A session file is gzip compressed text. The first line is a JSON header, every other line is one
+# message: "<" for lines from the engine or ">" for lines the bot sent, the microseconds since
+# recording started, and the line itself without its newline. Consecutive game states barely
+# differ, so gzip shrinks a whole game to a few tens of KiB.
+
+RECEIVED = "<"
+SENT = ">"
+
+
+class SessionRecorder:
+  def __init__(self, path:str, port_number:int) -> None:
+    self.path = path
+    self.file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    self.file.write(json.dumps({"version": 1, "port": port_number, "time": time.time()}) + "\n")
+    self.start = time.perf_counter_ns()
+
+  def record(self, direction:str, message:str) -> None:
+    self.file.write("%s %d %s\n" % (direction, (time.perf_counter_ns() - self.start) // 1000, message.rstrip("\n")))
+
+  def received(self, message:str) -> None:
+    if message:
+      self.record(RECEIVED, message)
+
+  def sent(self, message:str) -> None:
+    self.record(SENT, message)
+
+  def close(self) -> None:
+    self.file.close()
+    logging.info("Recorded session to " + self.path)
+
+
+"""Read a session file into its header and a list of (direction, microseconds, line) messages."""
+def load_session(path:str) -> (dict, list):
+  with gzip.open(path, "rt", encoding="utf-8") as f:
+    header = json.loads(f.readline())
+    messages = []
+    for line in f:
+      direction, micros, message = line.rstrip("\n").split(" ", 2)
+      messages.append((direction, int(micros), message))
+  return header, messages
+
+
+class ReplayClient:
+  """Stands in for Client by playing back a recorded session, so the bot runs without an engine.
+
+  read() returns the engine's lines in order, as fast as they are asked for, and "" once they run
+  out, just like a closed connection. write() compares every line the bot sends with the one it
+  sent in the recording; disconnect() logs how many differed and how long the replay took.
+  """
+
+  def __init__(self, path:str) -> None:
+    self.path = path
+    _, messages = load_session(path)
+    self.received = [message + "\n" for direction, _, message in messages if direction == RECEIVED]
+    self.sent = [message for direction, _, message in messages if direction == SENT]
+    self.reads = 0
+    self.writes = 0
+    self.mismatches = 0
+    self.connected = False
+
+  def connect(self):
+    self.connected = True
+    self.start = time.perf_counter()
+
+  def read(self) -> str:
+    if self.reads >= len(self.received):
+      return ""
+    message = self.received[self.reads]
+    self.reads += 1
+    logging.debug("Received message " + message)
+    return message
+
+  def write(self, message:str) -> None:
+    logging.debug("Sending message \"" + message + "\"")
+    if self.writes >= len(self.sent) or self.sent[self.writes] != message:
+      self.mismatches += 1
+    self.writes += 1
+
+  def disconnect(self):
+    elapsed = time.perf_counter() - self.start
+    logging.info("Replayed %d engine lines from %s in %.1f ms, %d of %d replies differ from the recording",
+                 self.reads, self.path, elapsed * 1000, self.mismatches, self.writes)
+    self.connected = False
@@ -0,0 +1,272 @@
+import random
+from typing import List
+
+import config
+from game.character_class import CharacterClass
+from game.effective_stats import combined_stat_set
+from game.game_state import GameState
+from game.item import Item
+from game.player_state import PlayerState
+from game.position import BOARD
+from game.stat_set import StatSet
+from simulator.simulator import CLASS_SWITCH, HILL_COORDS, HILL_SCORE, HIT_SCORE, PROCRUSTEAN_DAMAGE, SPAWNS, Simulator
+from util.utility import CHEBYSHEV, MANHATTAN
+
+# A PackedState keeps the whole game in one flat list of small ints: STRIDE slots per player at
+# player * STRIDE + field, followed by the turn. Enums are stored by their index in CLASSES and
+# ITEMS and positions by their cell index, so copying a state is a single list copy.
+POSITION, HEALTH, GOLD, SCORE, ITEM, EFFECT_TIMER, CLASS, IN_USE = range(8)
+STRIDE = 8
+TURN = 4 * STRIDE
+SIZE = TURN + 1
+
+CLASSES = tuple(CharacterClass)
+ITEMS = tuple(Item)
+NONE = ITEMS.index(Item.NONE)
+SHIELD = ITEMS.index(Item.SHIELD)
+PROCRUSTEAN_IRON = ITEMS.index(Item.PROCRUSTEAN_IRON)
+ITEM_TIMERS = tuple(item.value.item_timer for item in ITEMS)
+ITEM_COSTS = tuple(item.value.cost for item in ITEMS)
+# the class an item switches to when used, -1 for items that do not switch classes
+SWITCH = tuple(CLASSES.index(CLASS_SWITCH[item]) if item in CLASS_SWITCH else -1 for item in ITEMS)
+SPAWN_CELLS = tuple(spawn.index for spawn in SPAWNS)
+HILL_CELLS = frozenset(p.index for p in BOARD if p.x in HILL_COORDS and p.y in HILL_COORDS)
+
+
+def _stats(character_class: CharacterClass, item: Item, in_use: Item) -> tuple:
+    stat_set = combined_stat_set(character_class, item, in_use)
+    return stat_set.max_health, stat_set.damage, stat_set.speed, stat_set.range
+
+
+# (max_health, damage, speed, range) of every class, held item and item in use, see stats_index
+STATS = tuple(_stats(c, item, in_use) for c in CLASSES for item in ITEMS for in_use in ITEMS)
+
+
+def stats_index(character_class: int, item: int, in_use: int) -> int:
+    return (character_class * len(ITEMS) + item) * len(ITEMS) + in_use
+
+
+# Zobrist keys: ZOBRIST[slot][value] is a random 64 bit key and a state's hash is the XOR of the keys
+# of its slots, so changing a slot updates the hash with two XORs. Only the fields that decide what
+# players can do are hashed: position, health, held item, class and the item in use, which changes
+# stats and shields. Gold, score, effect timers and the turn are left out, so the same board met on
+# a later turn or with other scores hashes the same. The keys come from a fixed seed and are the
+# same in every process.
+HEALTH_VALUES = 64
+_keys = random.Random(0x5A0B).getrandbits
+_FIELD_VALUES = {POSITION: len(BOARD), HEALTH: HEALTH_VALUES, ITEM: len(ITEMS), CLASS: len(CLASSES), IN_USE: len(ITEMS)}
+ZOBRIST = tuple(tuple(_keys(64) for _ in range(_FIELD_VALUES[slot % STRIDE]))
+                if slot < TURN and slot % STRIDE in _FIELD_VALUES else None for slot in range(SIZE))
+del _keys
+
+
+def zobrist_hash(slots: List[int]) -> int:
+    value = 0
+    for slot, keys in enumerate(ZOBRIST):
+        if keys is not None:
+            value ^= keys[slots[slot]]
+    return value
+
+
+"""The Zobrist hash of a GameState, the same as its PackedState's, for strategies that do not use PackedState."""
+def hash_game_state(game_state: GameState) -> int:
+    return PackedState.from_game_state(game_state).hash
+
+
+class PackedState:
+    """The Simulator's game state packed into a list of ints, for search code that explores many positions.
+
+    The apply_* methods play one phase of a joint action with the Simulator's rules, in place. Every
+    slot they change is pushed on a trail first, so a search can mark() the trail, try a joint
+    action and undo() back to the mark in time proportional to the slots that changed, at most a
+    few per player. A player is dead from the ATTACK phase that killed them until begin_turn()
+    respawns them, which is when their health is 0.
+
+    Decisions are the Simulator's, except that moves are cell indices (Position.index) and
+    purchases are indices into ITEMS; None is a player that does nothing, like an invalid decision.
+
+    hash is the state's Zobrist hash, kept up to date by every change and undo.
+    """
+    __slots__ = ('slots', 'trail', 'hash')
+
+    def __init__(self, slots: List[int] = None, hash: int = None) -> None:
+        self.slots = list(slots) if slots is not None else [0] * SIZE
+        # (slot, previous value) pairs, flattened
+        self.trail = []
+        self.hash = zobrist_hash(self.slots) if hash is None else hash
+
+    @classmethod
+    def from_game_state(cls, game_state: GameState, effect_timer: List[int] = None,
+                        item_in_use: List[Item] = None) -> 'PackedState':
+        """Pack a GameState. Bots are not told about items in use, so unless effect_timer and
+        item_in_use are given every player is assumed to have none."""
+        slots = [0] * SIZE
+        for i, player in enumerate(game_state.player_state_list):
+            base = i * STRIDE
+            slots[base + POSITION] = player.position.index
+            slots[base + HEALTH] = player.health
+            slots[base + GOLD] = player.gold
+            slots[base + SCORE] = player.score
+            slots[base + ITEM] = ITEMS.index(player.item)
+            slots[base + EFFECT_TIMER] = effect_timer[i] if effect_timer is not None else 0
+            slots[base + CLASS] = CLASSES.index(player.character_class)
+            slots[base + IN_USE] = ITEMS.index(item_in_use[i]) if item_in_use is not None else NONE
+        slots[TURN] = game_state.turn
+        return cls(slots)
+
+    @classmethod
+    def from_simulator(cls, simulator: Simulator) -> 'PackedState':
+        return cls.from_game_state(simulator.snapshot(), simulator.effect_timer, simulator.item_in_use)
+
+    def to_game_state(self) -> GameState:
+        slots = self.slots
+        player_state_list = []
+        for i in range(4):
+            base = i * STRIDE
+            player = PlayerState()
+            player.character_class = CLASSES[slots[base + CLASS]]
+            player.item = ITEMS[slots[base + ITEM]]
+            player.position = BOARD[slots[base + POSITION]]
+            player.gold = slots[base + GOLD]
+            player.score = slots[base + SCORE]
+            player.health = slots[base + HEALTH]
+            max_health, damage, speed, reach = self.stats(i)
+            player.stat_set = StatSet(max_health=max_health, damage=damage, speed=speed, range=reach)
+            player.update_effective_stats()
+            player_state_list.append(player)
+        return GameState(turn=slots[TURN], player_state_list=player_state_list)
+
+    def copy(self) -> 'PackedState':
+        return PackedState(self.slots, self.hash)
+
+    """A hashable snapshot of every slot, equal for equal states."""
+    def key(self) -> tuple:
+        return tuple(self.slots)
+
+    @property
+    def turn(self) -> int:
+        return self.slots[TURN]
+
+    def position(self, i: int) -> int:
+        return self.slots[i * STRIDE + POSITION]
+
+    """(max_health, damage, speed, range) of player i, counting their passive item and item in use."""
+    def stats(self, i: int) -> tuple:
+        slots = self.slots
+        base = i * STRIDE
+        return STATS[stats_index(slots[base + CLASS], slots[base + ITEM], slots[base + IN_USE])]
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def undo(self, mark: int) -> None:
+        slots = self.slots
+        trail = self.trail
+        while len(trail) > mark:
+            value = trail.pop()
+            index = trail.pop()
+            keys = ZOBRIST[index]
+            if keys is not None:
+                self.hash ^= keys[slots[index]] ^ keys[value]
+            slots[index] = value
+
+    def _set(self, index: int, value: int) -> None:
+        slots = self.slots
+        previous = slots[index]
+        self.trail.append(index)
+        self.trail.append(previous)
+        slots[index] = value
+        keys = ZOBRIST[index]
+        if keys is not None:
+            self.hash ^= keys[previous] ^ keys[value]
+
+    def begin_turn(self) -> None:
+        slots = self.slots
+        self._set(TURN, slots[TURN] + 1)
+        for i in range(4):
+            base = i * STRIDE
+            if slots[base + HEALTH] == 0:
+                self._set(base + POSITION, SPAWN_CELLS[i])
+                self._set(base + HEALTH, self.stats(i)[0])
+
+    def apply_use(self, decisions: list) -> None:
+        slots = self.slots
+        for i, use in enumerate(decisions):
+            base = i * STRIDE
+            item = slots[base + ITEM]
+            timer = ITEM_TIMERS[item]
+            if use is not True or item == NONE or timer == -1:
+                continue
+            if SWITCH[item] >= 0:
+                self._set(base + CLASS, SWITCH[item])
+                self._set(base + HEALTH, CLASSES[SWITCH[item]].value.max_health)
+            else:
+                self._set(base + IN_USE, item)
+                self._set(base + EFFECT_TIMER, timer)
+            self._set(base + ITEM, NONE)
+
+    def apply_move(self, decisions: list) -> None:
+        slots = self.slots
+        for i, destination in enumerate(decisions):
+            if destination is None or not 0 <= destination < len(BOARD):
+                continue
+            base = i * STRIDE
+            position = slots[base + POSITION]
+            if destination != position and MANHATTAN[position][destination] <= self.stats(i)[2]:
+                self._set(base + POSITION, destination)
+
+    def apply_attack(self, decisions: list) -> None:
+        slots = self.slots
+        damage_taken = [0, 0, 0, 0]
+        for i, target in enumerate(decisions):
+            if not isinstance(target, int) or target == i or not 0 <= target < 4:
+                continue
+            base = i * STRIDE
+            victim = target * STRIDE
+            _, damage, _, reach = self.stats(i)
+            if CHEBYSHEV[slots[base + POSITION]][slots[victim + POSITION]] > reach:
+                continue
+            if slots[victim + IN_USE] == SHIELD:
+                continue
+            damage_taken[target] += PROCRUSTEAN_DAMAGE if slots[victim + ITEM] == PROCRUSTEAN_IRON else damage
+            self._set(base + SCORE, slots[base + SCORE] + HIT_SCORE)
+
+        for i in range(4):
+            if damage_taken[i] == 0:
+                continue
+            base = i * STRIDE
+            health = slots[base + HEALTH] - damage_taken[i]
+            if health <= 0:
+                self._set(base + HEALTH, 0)
+                if slots[base + ITEM] != NONE:
+                    self._set(base + ITEM, NONE)
+            else:
+                self._set(base + HEALTH, health)
+
+        for i in range(4):
+            base = i * STRIDE
+            if slots[base + HEALTH] > 0 and slots[base + POSITION] in HILL_CELLS:
+                self._set(base + SCORE, slots[base + SCORE] + HILL_SCORE)
+
+    def apply_buy(self, decisions: list) -> None:
+        slots = self.slots
+        for i, item in enumerate(decisions):
+            if item is None or item == NONE or not 0 <= item < len(ITEMS):
+                continue
+            base = i * STRIDE
+            if slots[base + ITEM] != NONE or slots[base + POSITION] != SPAWN_CELLS[i]:
+                continue
+            if slots[base + GOLD] >= ITEM_COSTS[item]:
+                self._set(base + GOLD, slots[base + GOLD] - ITEM_COSTS[item])
+                self._set(base + ITEM, item)
+
+    def end_turn(self) -> None:
+        slots = self.slots
+        for i in range(4):
+            base = i * STRIDE
+            self._set(base + GOLD, slots[base + GOLD] + config.GOLD_PER_TURN)
+            timer = slots[base + EFFECT_TIMER]
+            if timer > 0:
+                self._set(base + EFFECT_TIMER, timer - 1)
+                if timer == 1:
+                    self._set(base + IN_USE, NONE)
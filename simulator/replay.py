@@ -0,0 +1,154 @@
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import json
+import logging
+from optparse import OptionParser
+import os
+import time
+from typing import Dict, List
+
+from game.game_state import GameState
+from game.item import Item
+from game.position import Position
+from main import parse_dict_as_game_state
+from strategy.strategy_config import STRATEGIES, isolated_strategy
+
+METHODS = ["use_action_decision", "move_action_decision", "attack_action_decision", "buy_action_decision"]
+PERCENTILES = [50, 90, 99]
+
+
+"""The line the engine sends with the player states of a turn."""
+def engine_line(turn: int, player_states: List[dict]) -> str:
+    return json.dumps({'turn': turn, 'player_states': player_states})
+
+
+"""The player states a bot would have been sent before each phase of a recorded turn.
+
+The log only stores the player states at the end of every turn, so USE and MOVE see the previous
+turn's states, ATTACK additionally sees this turn's positions and BUY sees this turn's final states.
+"""
+def phase_player_states(turns: List[dict], index: int) -> List[List[dict]]:
+    before = turns[index - 1]['player_states']
+    after = turns[index]['player_states']
+    moved = [dict(previous, position=current['position']) for previous, current in zip(before, after)]
+    return [before, before, moved, after]
+
+
+"""Rebuild the GameState a bot would have been sent before each phase of a recorded turn."""
+def phase_states(turns: List[dict], index: int) -> List[GameState]:
+    turn = turns[index]['turn']
+    return [parse_dict_as_game_state({'turn': turn, 'player_states': player_states})
+            for player_states in phase_player_states(turns, index)]
+
+
+"""Turn a recorded game into the lines the engine sends each turn: the USE, MOVE, ATTACK and BUY states."""
+def phase_lines(path: str) -> List[List[str]]:
+    with open(path) as f:
+        turns = json.load(f)['turns']
+    return [[engine_line(turns[index]['turn'], player_states) for player_states in phase_player_states(turns, index)]
+            for index in range(1, len(turns))]
+
+
+def encode_decision(decision):
+    if isinstance(decision, Position):
+        return [decision.x, decision.y]
+    if isinstance(decision, Item):
+        return decision.name
+    return decision
+
+
+"""Replay one gamelog for every seat with each strategy and time every decision.
+
+:returns: {strategy: {"latencies": {method: [ns, ...]}, "decisions": {method: [decision, ...]}}}
+"""
+def replay_file(path: str, strategy_names: List[str], keep_decisions: bool) -> Dict[str, dict]:
+    with open(path) as f:
+        turns = json.load(f)['turns']
+    states = [phase_states(turns, index) for index in range(1, len(turns))]
+
+    results = {}
+    for name in strategy_names:
+        latencies = {method: [] for method in METHODS}
+        decisions = {method: [] for method in METHODS}
+        # strategies keep module level constants, so every seat gets a private copy of the module
+        for my_player_index in range(4):
+            strategy = isolated_strategy(STRATEGIES[name])
+            strategy.strategy_initialize(my_player_index)
+            for turn_states in states:
+                for method, game_state in zip(METHODS, turn_states):
+                    decide = getattr(strategy, method)
+                    start = time.perf_counter_ns()
+                    decision = decide(game_state, my_player_index)
+                    latencies[method].append(time.perf_counter_ns() - start)
+                    if keep_decisions:
+                        decisions[method].append(encode_decision(decision))
+        results[name] = {"latencies": latencies, "decisions": decisions}
+    return results
+
+
+def percentile(sorted_values: List[int], p: int) -> int:
+    if not sorted_values:
+        return 0
+    rank = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: Dict[str, List[int]]) -> Dict[str, dict]:
+    summary = {}
+    for method, values in latencies.items():
+        values = sorted(values)
+        summary[method] = {"count": len(values), "max_us": (values[-1] if values else 0) / 1000}
+        for p in PERCENTILES:
+            summary[method]["p%d_us" % p] = percentile(values, p) / 1000
+    return summary
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options] [gamelog.json ...]")
+    parser.add_option("--strategy", "-s", dest="strategies", action="append",
+                      help="Strategy to replay, one of " + ", ".join(STRATEGIES) + " (repeatable)", default=None)
+    parser.add_option("--workers", "-w", dest="workers", type="int", help="Worker processes", default=os.cpu_count())
+    parser.add_option("--output", "-o", dest="output", help="Write the summary and decisions to this JSON file",
+                      default=None)
+    (options, args) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    strategy_names = options.strategies or list(STRATEGIES)
+    for name in strategy_names:
+        if name not in STRATEGIES:
+            parser.error("Unknown strategy " + name)
+    paths = args or sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                  "gamelogs", "*.json")))
+    keep_decisions = options.output is not None
+
+    latencies = {name: {method: [] for method in METHODS} for name in strategy_names}
+    decisions = {name: {} for name in strategy_names}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=options.workers) as executor:
+        futures = {executor.submit(replay_file, path, strategy_names, keep_decisions): path for path in paths}
+        for future, path in futures.items():
+            for name, result in future.result().items():
+                for method in METHODS:
+                    latencies[name][method].extend(result["latencies"][method])
+                if keep_decisions:
+                    decisions[name][os.path.basename(path)] = result["decisions"]
+    logging.info("Replayed %d gamelogs in %.2fs", len(paths), time.perf_counter() - start)
+
+    report = {name: summarize(latencies[name]) for name in strategy_names}
+    for name, summary in report.items():
+        for method, stats in summary.items():
+            logging.info("%-8s %-22s n=%-7d " + " ".join("p%d=%%8.1fus" % p for p in PERCENTILES) + " max=%8.1fus",
+                         name, method, stats["count"], *[stats["p%d_us" % p] for p in PERCENTILES], stats["max_us"])
+
+    if options.output is not None:
+        with open(options.output, "w") as f:
+            json.dump({"latency": report, "decisions": decisions}, f)
+
+
+if __name__ == '__main__':
+    main()
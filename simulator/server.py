@@ -0,0 +1,264 @@
+import asyncio
+import json
+import logging
+from optparse import OptionParser
+import os
+import shlex
+import sys
+import time
+from typing import List
+
+import config
+from game.character_class import CharacterClass
+from game.game_state import GameState
+from game.item import Item
+from game.position import Position
+from simulator.simulator import Simulator
+from util.timing import Histogram
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASE_NAMES = ("USE", "MOVE", "ATTACK", "BUY")
+
+
+"""Serialize a GameState the way the engine does, including the fields only the engine tracks."""
+def encode_game_state(game_state: GameState, simulator: Simulator) -> str:
+    player_states = []
+    for i, player in enumerate(game_state.player_state_list):
+        player_states.append({
+            "class": player.character_class.name,
+            "position": {"x": player.position.x, "y": player.position.y},
+            "isActive": True,
+            "item": player.item.name,
+            "gold": player.gold,
+            "score": player.score,
+            "effect_timer": simulator.effect_timer[i],
+            "health": player.health,
+            "shielded": simulator.shielded[i],
+            "item_in_use": simulator.item_in_use[i].name,
+            "stat_set": {"damage": player.stat_set.damage, "speed": player.stat_set.speed,
+                         "range": player.stat_set.range, "maxHealth": player.stat_set.max_health},
+        })
+    return json.dumps({"turn": game_state.turn, "player_states": player_states})
+
+
+"""Turn a bot's action JSON into the decision its strategy made, or None if the line is not a valid action."""
+def decode_action(method: str, line: str):
+    try:
+        action = json.loads(line)
+        if method == "use_action_decision":
+            return action["use"] is True
+        if method == "move_action_decision":
+            return Position(action["destination"]["x"], action["destination"]["y"])
+        if method == "attack_action_decision":
+            return action["target"] if type(action["target"]) is int else None
+        return Item[action["item"]]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class Seat:
+    """A bot connected on one of config.PORTS, with the round trip latency of every phase."""
+
+    def __init__(self, index: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.index = index
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, line: str) -> None:
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+
+    async def receive(self) -> str:
+        return (await self.reader.readline()).decode()
+
+    async def ask(self, line: str, latency: Histogram) -> str:
+        start = time.perf_counter_ns()
+        await self.send(line)
+        reply = await self.receive()
+        latency.record(time.perf_counter_ns() - start)
+        return reply
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+
+class StandInEngine:
+    """Plays games against bots connected over config.PORTS, speaking the engine's line protocol.
+
+    Seats listed in remote are played by bots that connect on their port; the other seats are
+    played in-process by the strategies from strategy_config. Each game waits for every remote bot
+    to connect, sends wake and the player index, reads the class report, then streams a GameState
+    for every phase, sending the next one as soon as every bot answered, and finally sends fin.
+    play_game runs the game with the Simulator; play_recorded instead sends the lines of a recorded
+    game, see replay.phase_lines, and ignores the answers.
+
+    report_times holds when each remote bot reported its class. Once the last turn is answered the
+    played event is set, and fin is held back until release is set, so benchmarks can measure the
+    bots while they are still alive; release starts out set.
+    """
+
+    def __init__(self, remote: List[int], turns: int = config.TURNS) -> None:
+        self.remote = remote
+        self.turns = turns
+        self.connections = {index: asyncio.Queue() for index in remote}
+        self.latency = {name: Histogram() for name in PHASE_NAMES}
+        self.servers = []
+        self.report_times = {}
+        self.played = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def start(self) -> None:
+        for index in self.remote:
+            queue = self.connections[index]
+            self.servers.append(await asyncio.start_server(
+                lambda reader, writer, queue=queue: queue.put_nowait((reader, writer)), 'localhost', config.PORTS[index]))
+
+    async def stop(self) -> None:
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+
+    """Wait for every remote bot to connect, wake it and read its class report.
+
+    :returns: the seats and their reports.
+    """
+    async def seat_bots(self) -> (List[Seat], List[str]):
+        self.played.clear()
+        seats = [Seat(index, *await self.connections[index].get()) for index in self.remote]
+        for seat in seats:
+            await seat.send("wake")
+            await seat.send(str(seat.index))
+        reports = []
+        for seat in seats:
+            reports.append(await seat.receive())
+            self.report_times[seat.index] = time.perf_counter()
+        return seats, reports
+
+    async def finish(self, seats: List[Seat]) -> None:
+        self.played.set()
+        await self.release.wait()
+        for seat in seats:
+            await seat.send("fin")
+            await seat.close()
+
+    async def play_game(self) -> GameState:
+        from strategy.strategy_config import get_isolated_strategy
+        seats, reports = await self.seat_bots()
+        simulator = Simulator([None if i in self.remote else get_isolated_strategy(i) for i in range(4)], self.turns)
+        for seat, report in zip(seats, reports):
+            try:
+                simulator.join(seat.index, CharacterClass[json.loads(report)])
+            except (ValueError, KeyError, TypeError):
+                logging.warning("Player %d reported an unknown class %r, playing it as a KNIGHT", seat.index, report)
+                simulator.join(seat.index, None)
+
+        loop = asyncio.get_running_loop()
+        local = len(seats) < 4
+        while simulator.turn < simulator.turns:
+            simulator.begin_turn()
+            for name, (method, apply) in zip(PHASE_NAMES, Simulator.PHASES):
+                game_state = simulator.snapshot()
+                line = encode_game_state(game_state, simulator)
+                asks = [asyncio.ensure_future(seat.ask(line, self.latency[name])) for seat in seats]
+                # the in-process strategies decide on a worker thread, so the loop keeps sending to and
+                # reading from the bots meanwhile and their latency does not include this decision
+                decisions = await loop.run_in_executor(None, simulator.decide, method, game_state) if local else [None] * 4
+                for seat, reply in zip(seats, await asyncio.gather(*asks)):
+                    decisions[seat.index] = decode_action(method, reply)
+                getattr(simulator, apply)(decisions)
+            simulator.end_turn()
+
+        await self.finish(seats)
+        return simulator.snapshot()
+
+    """Send every remote bot the lines of a recorded game, one list of USE, MOVE, ATTACK and BUY lines per turn."""
+    async def play_recorded(self, turns: List[List[str]]) -> None:
+        seats, _ = await self.seat_bots()
+        for lines in turns:
+            for name, line in zip(PHASE_NAMES, lines):
+                await asyncio.gather(*[seat.ask(line, self.latency[name]) for seat in seats])
+        await self.finish(seats)
+
+
+"""Start the bots of the remote seats: one process each, or a single process serving all of them."""
+async def launch(bot: str, remote: List[int], one_process: bool, bot_args: List[str]) -> list:
+    groups = [remote] if one_process else [[index] for index in remote]
+    return [await asyncio.create_subprocess_exec(sys.executable, bot, *[str(index) for index in group], *bot_args,
+                                                 cwd=ROOT, stdout=asyncio.subprocess.DEVNULL,
+                                                 stderr=asyncio.subprocess.DEVNULL) for group in groups]
+
+
+"""Play games against remote bots and report the round trip latency and throughput of every phase."""
+async def benchmark(remote: List[int], games: int, turns: int, bot: str, one_process: bool, bot_args: List[str]) -> None:
+    engine = StandInEngine(remote, turns)
+    await engine.start()
+    if bot is None:
+        logging.info("Waiting for bots on ports %s", [config.PORTS[index] for index in remote])
+    elapsed = 0.0
+    try:
+        for _ in range(games):
+            processes = await launch(bot, remote, one_process, bot_args) if bot is not None else []
+            start = time.perf_counter()
+            final = await engine.play_game()
+            elapsed += time.perf_counter() - start
+            for process in processes:
+                await process.wait()
+            logging.debug("Final scores: %s", [p.score for p in final.player_state_list])
+    finally:
+        await engine.stop()
+
+    total = Histogram()
+    for histogram in engine.latency.values():
+        total.merge(histogram)
+    logging.info("%d bot%s: %d round trips in %.2fs, %.0f round trips/s", len(remote), "s"[len(remote) == 1:],
+                 total.count, elapsed, total.count / elapsed if elapsed else 0)
+    for name, histogram in list(engine.latency.items()) + [("all", total)]:
+        logging.info("  %-6s p50 %8.1fus  p90 %8.1fus  p99 %8.1fus  max %8.1fus", name, histogram.percentile(50) / 1000,
+                     histogram.percentile(90) / 1000, histogram.percentile(99) / 1000, histogram.max / 1000)
+
+
+"""Parse "4", "1-4" or "1,2,4" into the numbers of bots to benchmark."""
+def bot_counts(spec: str) -> List[int]:
+    counts = []
+    for item in spec.split(","):
+        first, _, last = item.partition("-")
+        counts.extend(range(int(first), int(last or first) + 1))
+    if not counts or min(counts) < 1 or max(counts) > len(config.PORTS):
+        raise ValueError("Bot counts must be between 1 and %d" % len(config.PORTS))
+    return counts
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog [options]\n\n"
+                                "Plays the engine for bots connecting on config.PORTS; seats without a bot are "
+                                "played in-process.")
+    parser.add_option("--bots", "-b", dest="bots", help="Bots to connect, e.g. 4, 1-4 or 1,2,4", default="4")
+    parser.add_option("--games", "-n", dest="games", type="int", help="Games per number of bots", default=1)
+    parser.add_option("--turns", "-t", dest="turns", type="int", help="Turns per game", default=config.TURNS)
+    parser.add_option("--launch", "-l", dest="launch", help="Start the bots from this script or bot.pyz for every game", default=None)
+    parser.add_option("--one-process", dest="one_process", action="store_true", help="With --launch, serve all bots from one process", default=False)
+    parser.add_option("--bot-args", dest="bot_args", help="Extra options for the launched bots, e.g. \"--pipeline\"", default="")
+    parser.add_option("--debug", "-d", dest="debug", action="store_true", help="Turn on debug mode", default=False)
+    (options, _) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.DEBUG if options.debug else logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    counts = bot_counts(options.bots)
+    if len(counts) > 1 and options.launch is None:
+        parser.error("benchmarking several numbers of bots needs --launch")
+    for count in counts:
+        asyncio.run(benchmark(list(range(count)), options.games, options.turns, options.launch,
+                              options.one_process, shlex.split(options.bot_args)))
+
+
+if __name__ == '__main__':
+    main()
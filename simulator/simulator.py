@@ -0,0 +1,217 @@
+from optparse import OptionParser
+import logging
+import time
+from typing import List
+
+import config
+from game.character_class import CharacterClass
+from game.effective_stats import combined_stat_set
+from game.game_state import GameState
+from game.item import Item
+from game.player_state import PlayerState
+from game.position import Position
+from game.stat_set import StatSet
+from strategy.strategy import Strategy
+
+SPAWNS = [Position(0, 0), Position(config.BOARD_SIZE - 1, 0),
+          Position(config.BOARD_SIZE - 1, config.BOARD_SIZE - 1), Position(0, config.BOARD_SIZE - 1)]
+HILL_COORDS = (config.BOARD_SIZE // 2 - 1, config.BOARD_SIZE // 2)
+HILL_SCORE = 2
+HIT_SCORE = 1
+PROCRUSTEAN_DAMAGE = 4
+CLASS_SWITCH = {
+    Item.HEAVY_BROADSWORD: CharacterClass.KNIGHT,
+    Item.MAGIC_STAFF: CharacterClass.WIZARD,
+    Item.STEEL_TIPPED_ARROW: CharacterClass.ARCHER,
+}
+
+
+class Simulator:
+    """Headless stand-in for the Engine that drives four strategies in-process.
+
+    Each turn runs the USE, MOVE, ATTACK and BUY phases in the engine's order and hands
+    every strategy a fresh GameState snapshot, just like the bot would get over the socket.
+    Positions are immutable, so strategies may keep references to them.
+
+    A seat whose strategy is None is left to the caller, which must join() it and collect its
+    decisions itself; that is how the stand-in engine server plays bots connected over sockets.
+    """
+
+    # the strategy method asked in every phase, and the method applying the decisions, in engine order
+    PHASES = (("use_action_decision", "apply_use"), ("move_action_decision", "apply_move"),
+              ("attack_action_decision", "apply_attack"), ("buy_action_decision", "apply_buy"))
+
+    def __init__(self, strategies: List[Strategy], turns: int = config.TURNS) -> None:
+        self.strategies = strategies
+        self.turns = turns
+        self.turn = 0
+        self.players = [PlayerState() for _ in range(4)]
+        # engine-side state that is not part of the PlayerState sent to bots
+        self.item_in_use = [Item.NONE] * 4
+        self.effect_timer = [0] * 4
+        self.shielded = [False] * 4
+        self.dead = [False] * 4
+
+        for i, strategy in enumerate(strategies):
+            if strategy is not None:
+                self.join(i, strategy.strategy_initialize(i))
+
+    def join(self, i: int, character_class: CharacterClass) -> None:
+        player = self.players[i]
+        player.character_class = character_class if isinstance(character_class, CharacterClass) \
+            else CharacterClass.KNIGHT
+        player.position = SPAWNS[i]
+        player.health = player.character_class.value.max_health
+        player.stat_set = self.effective_stat_set(i)
+
+    def effective_stat_set(self, i: int) -> StatSet:
+        player = self.players[i]
+        return combined_stat_set(player.character_class, player.item, self.item_in_use[i])
+
+    def snapshot(self) -> GameState:
+        player_state_list = []
+        for i, player in enumerate(self.players):
+            copy = PlayerState()
+            copy.character_class = player.character_class
+            copy.item = player.item
+            copy.position = player.position
+            copy.gold = player.gold
+            copy.score = player.score
+            copy.health = player.health
+            copy.stat_set = self.effective_stat_set(i)
+            copy.update_effective_stats()
+            player_state_list.append(copy)
+        return GameState(turn=self.turn, player_state_list=player_state_list)
+
+    def run(self) -> GameState:
+        while self.turn < self.turns:
+            self.play_turn()
+        return self.snapshot()
+
+    def play_turn(self) -> None:
+        self.begin_turn()
+        for method, apply in self.PHASES:
+            getattr(self, apply)(self.decide(method, self.snapshot()))
+        self.end_turn()
+
+    def begin_turn(self) -> None:
+        self.turn += 1
+        self.respawn()
+
+    def decide(self, method: str, game_state: GameState) -> list:
+        return [getattr(strategy, method)(game_state, i) if strategy is not None else None
+                for i, strategy in enumerate(self.strategies)]
+
+    def respawn(self) -> None:
+        for i, player in enumerate(self.players):
+            if self.dead[i]:
+                self.dead[i] = False
+                player.position = SPAWNS[i]
+                player.health = self.effective_stat_set(i).max_health
+
+    def apply_use(self, decisions: list) -> None:
+        for i, use in enumerate(decisions):
+            player = self.players[i]
+            timer = player.item.value.item_timer
+            if use is not True or player.item == Item.NONE or timer == -1:
+                continue
+            if player.item in CLASS_SWITCH:
+                player.character_class = CLASS_SWITCH[player.item]
+                player.health = player.character_class.value.max_health
+            else:
+                self.item_in_use[i] = player.item
+                self.effect_timer[i] = timer
+                self.shielded[i] = player.item == Item.SHIELD
+            player.item = Item.NONE
+
+    def apply_move(self, decisions: list) -> None:
+        for i, destination in enumerate(decisions):
+            if not isinstance(destination, Position) or not destination.in_bounds:
+                continue
+            position = self.players[i].position
+            if abs(position.x - destination.x) + abs(position.y - destination.y) <= self.effective_stat_set(i).speed:
+                self.players[i].position = destination
+
+    def apply_attack(self, decisions: list) -> None:
+        damage_taken = [0] * 4
+        for i, target in enumerate(decisions):
+            if not isinstance(target, int) or target == i or not 0 <= target < 4:
+                continue
+            attacker = self.players[i]
+            victim = self.players[target]
+            stat_set = self.effective_stat_set(i)
+            if max(abs(attacker.position.x - victim.position.x),
+                   abs(attacker.position.y - victim.position.y)) > stat_set.range:
+                continue
+            if self.shielded[target]:
+                continue
+            damage_taken[target] += PROCRUSTEAN_DAMAGE if victim.item == Item.PROCRUSTEAN_IRON else stat_set.damage
+            attacker.score += HIT_SCORE
+
+        for i, player in enumerate(self.players):
+            if damage_taken[i] == 0:
+                continue
+            player.health -= damage_taken[i]
+            if player.health <= 0:
+                player.health = 0
+                player.item = Item.NONE
+                self.dead[i] = True
+
+        for i, player in enumerate(self.players):
+            if not self.dead[i] and player.position.x in HILL_COORDS and player.position.y in HILL_COORDS:
+                player.score += HILL_SCORE
+
+    def apply_buy(self, decisions: list) -> None:
+        for i, item in enumerate(decisions):
+            player = self.players[i]
+            if not isinstance(item, Item) or item == Item.NONE or player.item != Item.NONE:
+                continue
+            if player.position.x != SPAWNS[i].x or player.position.y != SPAWNS[i].y:
+                continue
+            if player.gold >= item.value.cost:
+                player.gold -= item.value.cost
+                player.item = item
+
+    def end_turn(self) -> None:
+        for i, player in enumerate(self.players):
+            player.gold += config.GOLD_PER_TURN
+            if self.effect_timer[i] > 0:
+                self.effect_timer[i] -= 1
+                if self.effect_timer[i] == 0:
+                    self.item_in_use[i] = Item.NONE
+                    self.shielded[i] = False
+
+
+"""Play a single game with the strategies registered in strategy_config and return the final GameState."""
+def simulate_game(turns: int = config.TURNS) -> GameState:
+    from strategy.strategy_config import get_isolated_strategy
+    # each seat gets its own copy of the strategy's module level state, or they would share one spawn
+    return Simulator([get_isolated_strategy(player_index=i) for i in range(4)], turns=turns).run()
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option("--games", "-n", dest="games", type="int", help="Number of games to simulate", default=100)
+    parser.add_option("--turns", "-t", dest="turns", type="int", help="Turns per game", default=config.TURNS)
+    (options, _) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    wins = [0, 0, 0, 0]
+    start = time.perf_counter()
+    for _ in range(options.games):
+        scores = [p.score for p in simulate_game(options.turns).player_state_list]
+        wins[scores.index(max(scores))] += 1
+    elapsed = time.perf_counter() - start
+
+    logging.info("Simulated %d games of %d turns in %.2fs (%.0f games/min)",
+                 options.games, options.turns, elapsed, options.games / elapsed * 60)
+    logging.info("Wins per player index: %s", wins)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import importlib
+import itertools
+import json
+import logging
+import math
+from multiprocessing import Pool
+from optparse import OptionParser
+import os
+import random
+import time
+from typing import Dict, Iterator, List
+
+import config
+from game.character_class import CharacterClass
+from simulator.simulator import Simulator
+from strategy.strategy_config import STRATEGIES, isolated_strategy
+
+# games between which the progress is logged and the summary rewritten
+PROGRESS_EVERY = 1000
+# two sided 95% normal quantile for the confidence intervals
+Z = 1.96
+
+
+"""Resolve a strategy by its name in strategy_config.STRATEGIES or as "package.module:ClassName"."""
+def strategy_class(name: str) -> type:
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError("Unknown strategy %r, use one of %s or module:Class" % (name, sorted(STRATEGIES)))
+    return getattr(importlib.import_module(module), class_name)
+
+
+"""Every game of the tournament, in a fixed order so a game id always means the same game.
+
+A matchup puts a strategy in each of the four seats and, with classes, forces every seat's starting
+class; None lets the strategy pick its own. The Simulator is deterministic, so a matchup of
+deterministic strategies is the same game every time and is played once. A matchup with any other
+strategy is played games times, each game with its own seed for the random module.
+"""
+def schedule(strategies: List[str], classes: bool, games: int, turns: int, seed: int) -> Iterator[dict]:
+    class_matchups = itertools.product([c.name for c in CharacterClass], repeat=4) if classes else [(None,) * 4]
+    matchups = itertools.product(itertools.product(strategies, repeat=4), class_matchups)
+    game_id = 0
+    for seats, seat_classes in matchups:
+        repeats = 1 if all(strategy_class(name).deterministic for name in seats) else games
+        for _ in range(repeats):
+            yield {"id": game_id, "seed": seed + game_id, "seats": list(seats), "classes": list(seat_classes),
+                   "turns": turns}
+            game_id += 1
+
+
+"""Play one scheduled game with a fresh, isolated strategy in every seat."""
+def play_game(game: dict) -> dict:
+    start = time.perf_counter()
+    random.seed(game["seed"])
+    simulator = Simulator([isolated_strategy(strategy_class(name)) for name in game["seats"]], game["turns"])
+    for i, character_class in enumerate(game["classes"]):
+        if character_class is not None:
+            simulator.join(i, CharacterClass[character_class])
+    classes = [player.character_class.name for player in simulator.players]
+    scores = [player.score for player in simulator.run().player_state_list]
+    best = max(scores)
+    return dict(game, classes=classes, scores=scores, winners=[i for i, score in enumerate(scores) if score == best],
+                seconds=time.perf_counter() - start)
+
+
+class Running:
+    """Count, mean and variance of a stream of numbers, updated one at a time (Welford)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def interval(self) -> float:
+        if self.count < 2:
+            return float("inf")
+        return Z * math.sqrt(self.m2 / (self.count - 1) / self.count)
+
+
+"""Wilson score interval of a win rate, (low, high)."""
+def wilson(wins: float, count: int) -> (float, float):
+    if not count:
+        return 0.0, 1.0
+    rate = wins / count
+    denominator = 1 + Z * Z / count
+    center = (rate + Z * Z / (2 * count)) / denominator
+    spread = Z * math.sqrt(rate * (1 - rate) / count + Z * Z / (4 * count * count)) / denominator
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+class Standings:
+    """Win rate and score of every strategy, and of every strategy and starting class, over the seats it played.
+
+    A win shared by several seats counts as a fraction of a win for each of them. The 95% confidence
+    intervals treat every seat played as an independent sample, which covers the noise of strategies
+    that are not deterministic as well as the spread over the matchups.
+    """
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.wins = {}
+        self.scores = {}
+
+    def add(self, result: dict) -> None:
+        self.games += 1
+        for seat, (name, character_class) in enumerate(zip(result["seats"], result["classes"])):
+            won = 1 / len(result["winners"]) if seat in result["winners"] else 0
+            for key in (name, name + "/" + character_class):
+                self.wins[key] = self.wins.get(key, 0) + won
+                self.scores.setdefault(key, Running()).add(result["scores"][seat])
+
+    def report(self) -> Dict[str, dict]:
+        report = {}
+        for key, scores in sorted(self.scores.items()):
+            low, high = wilson(self.wins[key], scores.count)
+            report[key] = {"seats": scores.count, "win_rate": self.wins[key] / scores.count, "win_rate_ci": [low, high],
+                           "mean_score": scores.mean, "mean_score_ci": scores.interval()}
+        return report
+
+    def table(self) -> List[str]:
+        lines = ["%-28s %7s %8s %17s %11s" % ("strategy", "seats", "win rate", "95% CI", "mean score")]
+        for key, row in self.report().items():
+            lines.append("%-28s %7d %7.1f%% [%5.1f%%, %5.1f%%] %6.1f ±%4.1f" % (
+                key, row["seats"], row["win_rate"] * 100, row["win_rate_ci"][0] * 100, row["win_rate_ci"][1] * 100,
+                row["mean_score"], row["mean_score_ci"]))
+        return lines
+
+
+def write_summary(path: str, header: dict, standings: Standings, scheduled: int) -> None:
+    with open(path, "w") as f:
+        json.dump({"tournament": header, "games": standings.games, "scheduled": scheduled,
+                   "standings": standings.report()}, f, indent=2)
+
+
+"""Read the results of an earlier run of the same tournament, skipping a last line cut short by a crash.
+
+:returns: the finished games by id, or an empty dict when there is no earlier run, and whether the
+file ends with a complete line.
+"""
+def load_results(path: str, header: dict) -> (Dict[int, dict], bool):
+    if not os.path.exists(path):
+        return {}, True
+    results = {}
+    with open(path) as f:
+        text = f.read()
+    lines = text.splitlines()
+    if not lines:
+        return {}, True
+    if json.loads(lines[0]) != header:
+        raise ValueError("%s holds the results of another tournament, pick another output file" % path)
+    for line in lines[1:]:
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        results[result["id"]] = result
+    return results, text.endswith("\n")
+
+
+def main():
+    parser = OptionParser(usage="usage: %prog -s STRATEGY [-s STRATEGY ...] [options]")
+    parser.add_option("--strategy", "-s", dest="strategies", action="append",
+                      help="Strategy to enter, by name in strategy_config or as module:Class, repeatable")
+    parser.add_option("--classes", "-c", dest="classes", action="store_true",
+                      help="Also force every combination of starting classes", default=False)
+    parser.add_option("--games", "-g", dest="games", type="int",
+                      help="Games per matchup with a strategy that is not deterministic", default=10)
+    parser.add_option("--turns", "-t", dest="turns", type="int", help="Turns per game", default=config.TURNS)
+    parser.add_option("--seed", dest="seed", type="int", help="Seed of the first game", default=0)
+    parser.add_option("--workers", "-w", dest="workers", type="int", help="Worker processes", default=os.cpu_count())
+    parser.add_option("--chunk", dest="chunk", type="int", help="Games a worker takes from the queue at a time", default=8)
+    parser.add_option("--output", "-o", dest="output", help="Results file, resumed if it exists", default="tournament.jsonl")
+    (options, _) = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)-8s %(module)-8s %(message)s',
+        level=logging.INFO,
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    strategies = sorted(set(options.strategies or STRATEGIES))
+    for name in strategies:
+        strategy_class(name)
+    header = {"strategies": strategies, "classes": options.classes, "games": options.games,
+              "turns": options.turns, "seed": options.seed}
+    done, complete = load_results(options.output, header)
+    games = list(schedule(strategies, options.classes, options.games, options.turns, options.seed))
+    pending = [game for game in games if game["id"] not in done]
+    logging.info("%d games to play, %d already in %s", len(pending), len(done), options.output)
+    summary = os.path.splitext(options.output)[0] + ".summary.json"
+    standings = Standings()
+    for game_id in sorted(done):
+        standings.add(done[game_id])
+
+    start = time.perf_counter()
+    with open(options.output, "a") as out:
+        if out.tell() == 0:
+            out.write(json.dumps(header) + "\n")
+        elif not complete:
+            # end the line a crash cut short, which load_results skips, so the next result gets its own
+            out.write("\n")
+        # idle workers pull the next chunk from the shared queue, so slow games never hold up the rest
+        with Pool(options.workers) as pool:
+            for played, result in enumerate(pool.imap_unordered(play_game, pending, chunksize=options.chunk), 1):
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                standings.add(result)
+                if played % PROGRESS_EVERY == 0:
+                    elapsed = time.perf_counter() - start
+                    logging.info("%d / %d games, %.0f games/min", played, len(pending), played / elapsed * 60)
+                    write_summary(summary, header, standings, len(games))
+    elapsed = time.perf_counter() - start
+
+    logging.info("Played %d games in %.1fs (%.0f games/min)", len(pending), elapsed,
+                 len(pending) / elapsed * 60 if elapsed else 0)
+    for line in standings.table():
+        logging.info(line)
+    write_summary(summary, header, standings, len(games))
+
+
+if __name__ == '__main__':
+    main()
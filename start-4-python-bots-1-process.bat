@@ -0,0 +1 @@
+start cmd /k py bot.pyz 0 1 2 3
\ No newline at end of file
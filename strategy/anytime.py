@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+
+from game.game_state import GameState
+from game.item import Item
+from game.position import Position
+from strategy.strategy import Strategy
+
+
+class AnytimeDecision:
+    """The deadline of one phase and the best answer a strategy has published for it so far.
+
+    The budget counts from start, a time.perf_counter() such as when the phase's line was read,
+    or from now.
+    """
+
+    def __init__(self, budget: float, start: float = None) -> None:
+        self.deadline = (time.perf_counter() if start is None else start) + budget
+        self.best = None
+        self.published = False
+
+    def time_left(self) -> float:
+        return self.deadline - time.perf_counter()
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.deadline
+
+    def publish(self, answer) -> None:
+        self.best = answer
+        self.published = True
+
+
+# cheap answers that are always legal, sent when a strategy published nothing before its deadline
+def fallback_use(game_state: GameState, my_player_index: int) -> bool:
+    return False
+
+def fallback_move(game_state: GameState, my_player_index: int) -> Position:
+    return game_state.player_state_list[my_player_index].position
+
+def fallback_attack(game_state: GameState, my_player_index: int) -> int:
+    return my_player_index
+
+def fallback_buy(game_state: GameState, my_player_index: int) -> Item:
+    return Item.NONE
+
+
+class AnytimeRunner:
+    """Watchdog that runs a strategy's phase methods on a worker thread under a per-phase budget.
+
+    Before each call the strategy's decision attribute is set to a fresh AnytimeDecision, so a
+    strategy can poll time_left() and publish() its best answer so far. If the method returns in
+    time its result is used; otherwise the last published answer, or the phase fallback, is sent.
+    Python threads cannot be stopped, so a late method keeps running in the background; until it
+    finishes every following phase is answered with its fallback straight away, which keeps the
+    strategy's code from ever running twice at the same time. The late method keeps reading the
+    GameState it was given, so the caller must not update that GameState while busy().
+
+    cProfile only sees the thread it is enabled on, so a profiler passed to decide() runs the method
+    on the worker thread. decide() waits by joining the worker, which blocks the calling thread for
+    up to the budget; bots sharing an event loop must call it from a thread of their own. The budget
+    counts from start when given, so time spent before decide() was called is not granted again.
+    """
+
+    def __init__(self, strategy: Strategy, budget: float) -> None:
+        self.strategy = strategy
+        self.budget = budget
+        self.worker = None
+
+    def busy(self) -> bool:
+        return self.worker is not None and self.worker.is_alive()
+
+    def decide(self, method, game_state: GameState, my_player_index: int, fallback, profiler=None,
+               start: float = None):
+        if self.busy():
+            logging.warning("Previous decision is still running, sending fallback for " + method.__name__)
+            return fallback(game_state, my_player_index)
+
+        decision = AnytimeDecision(self.budget, start)
+        self.strategy.decision = decision
+        outcome = {}
+
+        def run():
+            try:
+                if profiler is not None:
+                    outcome["result"] = profiler.runcall(method, game_state, my_player_index)
+                else:
+                    outcome["result"] = method(game_state, my_player_index)
+            except BaseException as e:
+                outcome["error"] = e
+
+        self.worker = threading.Thread(target=run, name="anytime-" + method.__name__, daemon=True)
+        self.worker.start()
+        self.worker.join(max(0.0, decision.time_left()))
+
+        if not self.worker.is_alive():
+            self.strategy.decision = None
+            if "error" in outcome:
+                raise outcome["error"]
+            return outcome["result"]
+
+        if decision.published:
+            logging.warning(method.__name__ + " ran out of time, sending its best answer so far")
+            return decision.best
+        logging.warning(method.__name__ + " ran out of time without an answer, sending fallback")
+        return fallback(game_state, my_player_index)
@@ -0,0 +1,102 @@
+import logging
+import threading
+
+from game.game_state import GameState
+from game.position import Position
+from strategy.starter_strategy import predict
+from strategy.strategy import Strategy
+
+
+# everything a strategy can read from a GameState, used to check a speculative answer still applies
+def fingerprint(game_state: GameState) -> tuple:
+    return (game_state.turn,) + tuple([(p.character_class, p.item, p.position, p.gold, p.score, p.health,
+                                        p.stat_set.max_health, p.stat_set.damage, p.stat_set.speed, p.stat_set.range)
+                                       for p in game_state.player_state_list])
+
+
+class SpeculativePipeline:
+    """Computes the MOVE and ATTACK decisions while the bot is blocked waiting for the engine.
+
+    Right after the USE action is sent, a worker thread calls move_action_decision on the current
+    GameState, then attack_action_decision on the same state with our player moved to the chosen
+    destination and every opponent moved where starter_strategy.predict expects them: as close to
+    the nearest hill as their speed allows. When the real state for a phase arrives, the speculative
+    answer is used if the state matches what the worker saw; otherwise the strategy is simply asked
+    again.
+
+    A miss therefore calls move_action_decision or attack_action_decision twice for the same
+    phase, once on the guessed state and once on the real one, and every MOVE call is made with a
+    guess of the state. Strategies run with the pipeline must not update their own state in those
+    two methods; the strategies in this package only do so in the USE and BUY phases.
+
+    The worker reads the live GameState, so wait() must be called before the decoder updates it,
+    and the strategy is never asked anything while the worker runs. profilers, one per SPECULATED
+    method or None, run that call under a PhaseProfiler on the worker thread.
+    """
+
+    SPECULATED = ("move_action_decision", "attack_action_decision")
+
+    def __init__(self, strategy: Strategy) -> None:
+        self.strategy = strategy
+        self.worker = None
+        self.speculations = {}
+        self.stats = {name: [0, 0] for name in self.SPECULATED}
+
+    def speculate(self, game_state: GameState, my_player_index: int, profilers: tuple = (None, None)) -> None:
+        self.wait()
+        self.speculations = {}
+        self.worker = threading.Thread(target=self._run, args=(game_state, my_player_index, profilers),
+                                       name="speculation", daemon=True)
+        self.worker.start()
+
+    def _run(self, game_state: GameState, my_player_index: int, profilers: tuple) -> None:
+        def call(method, profiler):
+            if profiler is not None:
+                return profiler.runcall(method, game_state, my_player_index)
+            return method(game_state, my_player_index)
+
+        try:
+            key = fingerprint(game_state)
+            move = call(self.strategy.move_action_decision, profilers[0])
+            self.speculations["move_action_decision"] = (key, move)
+            if not isinstance(move, Position) or not move.in_bounds:
+                return
+
+            players = game_state.player_state_list
+            positions = [player.position for player in players]
+            guesses = dict(predict(my_player_index, game_state))
+            guesses[my_player_index] = move
+            try:
+                for i, guess in guesses.items():
+                    players[i].position = guess
+                key = fingerprint(game_state)
+                attack = call(self.strategy.attack_action_decision, profilers[1])
+            finally:
+                for player, position in zip(players, positions):
+                    player.position = position
+            self.speculations["attack_action_decision"] = (key, attack)
+        except Exception as e:
+            # the real call will run again and surface the error
+            logging.debug("Speculation failed: " + repr(e))
+
+    def wait(self) -> None:
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    """:returns: (True, answer) when a speculative answer for method was computed on this game state."""
+    def take(self, method, game_state: GameState):
+        name = method.__name__
+        if name not in self.stats:
+            return False, None
+        self.wait()
+        entry = self.speculations.pop(name, None)
+        if entry is not None and entry[0] == fingerprint(game_state):
+            self.stats[name][0] += 1
+            return True, entry[1]
+        self.stats[name][1] += 1
+        return False, None
+
+    def report(self) -> str:
+        return ", ".join("%s: %d hits / %d misses" % (name, hits, misses)
+                         for name, (hits, misses) in self.stats.items())
@@ -0,0 +1,275 @@
+import math
+import time
+
+import config
+from game.game_state import GameState
+from game.item import Item
+from game.position import BOARD, Position
+from simulator.packed_state import HEALTH, HILL_CELLS, IN_USE, ITEM, POSITION, PROCRUSTEAN_IRON, SCORE, SHIELD, \
+    STRIDE, PackedState
+from simulator.simulator import HILL_SCORE, HIT_SCORE, PROCRUSTEAN_DAMAGE
+from strategy.starter_strategy import StarterStrategy, closest_hill
+from strategy.strategy import Strategy
+import util.reachability
+from util.transposition import TranspositionTable
+from util.utility import CHEBYSHEV, MANHATTAN
+
+MOVE, ATTACK = 0, 1
+# Manhattan distance from every cell to the nearest hill
+HILL_DISTANCE = tuple(min(MANHATTAN[cell][hill] for hill in HILL_CELLS) for cell in range(len(BOARD)))
+# score a death is worth at the end of a search, about a hill turn lost walking back from spawn; more
+# than that keeps the search off the contested hills
+DEATH_COST = HILL_SCORE
+# the time check and publish() run once every so many iterations
+CHECK_EVERY = 8
+# seconds kept back from an anytime deadline for sending the answer
+SAFETY = 0.002
+
+# greedy rollout moves by (cell, speed), filled as cells come up
+_greedy_moves = {}
+
+
+"""The move StarterStrategy predicts for everyone: as close to the nearest hill as the speed allows."""
+def greedy_move(cell: int, speed: int) -> int:
+    try:
+        return _greedy_moves[cell, speed]
+    except KeyError:
+        position = BOARD[cell]
+        move = _greedy_moves[cell, speed] = util.reachability.nearest_reachable(
+            position, speed, closest_hill(position)).index
+        return move
+
+
+"""The target StarterStrategy attacks: the healthiest player it can kill, else the best scorer in range.
+
+Returns i itself, which attacks no one, when nobody is in range.
+"""
+def greedy_attack(state: PackedState, i: int) -> int:
+    slots = state.slots
+    _, damage, _, reach = state.stats(i)
+    cell = slots[i * STRIDE + POSITION]
+    target = i
+    best = None
+    for j in range(4):
+        base = j * STRIDE
+        if j == i or CHEBYSHEV[cell][slots[base + POSITION]] > reach:
+            continue
+        health = slots[base + HEALTH]
+        lethal = PROCRUSTEAN_DAMAGE if slots[base + ITEM] == PROCRUSTEAN_IRON else damage
+        key = (1, health) if slots[base + IN_USE] != SHIELD and health <= lethal else (0, slots[base + SCORE])
+        if best is None or key > best:
+            target, best = j, key
+    return target
+
+
+class Node:
+    """A node of a decoupled UCT tree: every player runs their own UCB1 bandit over their own choices.
+
+    arms[player] holds a player's choices in this node; counts and totals their visits and summed
+    rewards. Children are keyed by the tuple of arm indices the players picked.
+    """
+    __slots__ = ('arms', 'visits', 'counts', 'totals', 'children')
+
+    def __init__(self, arms: tuple) -> None:
+        self.arms = arms
+        self.visits = 0
+        self.counts = [[0] * len(choices) for choices in arms]
+        self.totals = [[0.0] * len(choices) for choices in arms]
+        self.children = {}
+
+    def select(self, exploration: float) -> tuple:
+        log_visits = math.log(self.visits) if self.visits else 0.0
+        joint = []
+        for counts, totals in zip(self.counts, self.totals):
+            best = 0
+            best_value = -math.inf
+            for arm, count in enumerate(counts):
+                if count == 0:
+                    best = arm
+                    break
+                value = totals[arm] / count + exploration * math.sqrt(log_visits / count)
+                if value > best_value:
+                    best, best_value = arm, value
+            joint.append(best)
+        return tuple(joint)
+
+    def update(self, joint: tuple, rewards: list) -> None:
+        self.visits += 1
+        for player, arm in enumerate(joint):
+            self.counts[player][arm] += 1
+            self.totals[player][arm] += rewards[player]
+
+    """The most visited choice of player, the first one on ties."""
+    def best(self, player: int):
+        counts = self.counts[player]
+        return self.arms[player][counts.index(max(counts))]
+
+
+class SearchStrategy(Strategy):
+    """Monte Carlo tree search over the joint MOVE and ATTACK choices of all four players.
+
+    Each MOVE and ATTACK phase grows a decoupled UCT tree over the next horizon turns on a
+    PackedState, alternating MOVE and ATTACK plies, until budget seconds (or iterations, if set)
+    are used up, and answers with our most visited choice. Below the tree the game is played out
+    with the starter heuristics, greedy_move and greedy_attack. Every player is scored by their
+    score gain minus the best gain of the others, so each one plays for themselves.
+
+    The USE and BUY phases and the starting class are left to the heuristic strategy, which runs in
+    a private copy of its module so several searching bots do not share its state. In anytime mode
+    the greedy move is published before searching and the best choice so far every few iterations,
+    and the search stops early enough to meet the deadline.
+
+    Subclasses can change the choices searched (candidate_moves, candidate_attacks), the playout
+    (rollout_move, rollout_attack) and the scoring (evaluate). The candidates only depend on what the
+    Zobrist hash covers, so they are cached in a TranspositionTable by hash, phase and player.
+    """
+
+    def __init__(self, budget: float = 0.05, iterations: int = None, horizon: int = 3, exploration: float = 0.7,
+                 width: int = 8, opponent_width: int = 3, heuristic: type = StarterStrategy,
+                 table: TranspositionTable = None) -> None:
+        from strategy.strategy_config import isolated_strategy
+        self.budget = budget
+        self.iterations = iterations
+        self.horizon = horizon
+        self.exploration = exploration
+        self.width = width
+        self.opponent_width = opponent_width
+        self.heuristic = isolated_strategy(heuristic)
+        # the candidate choices of positions seen before, kept across phases and turns
+        self.table = table if table is not None else TranspositionTable(1 << 14, "lru")
+        self.my_player_index = None
+        # totals over every search, for benchmarks
+        self.stats = {"searches": 0, "iterations": 0, "nodes": 0, "plies": 0, "seconds": 0.0}
+
+    def strategy_initialize(self, my_player_index: int):
+        return self.heuristic.strategy_initialize(my_player_index)
+
+    def use_action_decision(self, game_state: GameState, my_player_index: int) -> bool:
+        return self.heuristic.use_action_decision(game_state, my_player_index)
+
+    def buy_action_decision(self, game_state: GameState, my_player_index: int) -> Item:
+        return self.heuristic.buy_action_decision(game_state, my_player_index)
+
+    def move_action_decision(self, game_state: GameState, my_player_index: int) -> Position:
+        return BOARD[self.search(PackedState.from_game_state(game_state), MOVE, my_player_index)]
+
+    def attack_action_decision(self, game_state: GameState, my_player_index: int) -> int:
+        return self.search(PackedState.from_game_state(game_state), ATTACK, my_player_index)
+
+    def candidate_moves(self, state: PackedState, i: int) -> tuple:
+        cell = state.position(i)
+        speed = state.stats(i)[2]
+        # the greedy move, staying and the hills first, then the other cells closest to a hill
+        choices = [greedy_move(cell, speed), cell] + sorted(hill for hill in HILL_CELLS if MANHATTAN[cell][hill] <= speed)
+        width = self.width if i == self.my_player_index else self.opponent_width
+        if len(set(choices)) < width:
+            choices += sorted((p.index for p in util.reachability.reachable(BOARD[cell], speed)),
+                              key=HILL_DISTANCE.__getitem__)
+        return tuple(dict.fromkeys(choices))[:width]
+
+    def candidate_attacks(self, state: PackedState, i: int) -> tuple:
+        slots = state.slots
+        cell = slots[i * STRIDE + POSITION]
+        reach = state.stats(i)[3]
+        targets = tuple(j for j in range(4) if j != i and CHEBYSHEV[cell][slots[j * STRIDE + POSITION]] <= reach)
+        # attacking yourself attacks no one, the only choice when nobody is in range
+        return targets or (i,)
+
+    def rollout_move(self, state: PackedState, i: int) -> int:
+        return greedy_move(state.position(i), state.stats(i)[2])
+
+    def rollout_attack(self, state: PackedState, i: int) -> int:
+        return greedy_attack(state, i)
+
+    """The reward of every player at the end of a playout, from the scores at the root."""
+    def evaluate(self, state: PackedState, root_scores: list) -> list:
+        slots = state.slots
+        gains = [slots[i * STRIDE + SCORE] - root_scores[i] - (DEATH_COST if slots[i * STRIDE + HEALTH] == 0 else 0)
+                 for i in range(4)]
+        # the most a player can gain in a turn is standing on a hill and hitting all three others
+        scale = self.horizon * (HILL_SCORE + 3 * HIT_SCORE)
+        return [(gain - max(gains[:i] + gains[i + 1:])) / scale for i, gain in enumerate(gains)]
+
+    def arms(self, state: PackedState, phase: int) -> tuple:
+        key = state.hash << 3 | phase << 2 | self.my_player_index
+        arms = self.table.get(key)
+        if arms is None:
+            candidates = self.candidate_moves if phase == MOVE else self.candidate_attacks
+            arms = tuple(candidates(state, i) for i in range(4))
+            self.table.put(key, arms)
+        return arms
+
+    """Play one ply of decisions and, after an ATTACK ply, the end of the turn; begin the next turn if plies remain."""
+    def play(self, state: PackedState, phase: int, decisions: list, plies: int) -> None:
+        if phase == MOVE:
+            state.apply_move(decisions)
+            return
+        state.apply_attack(decisions)
+        state.end_turn()
+        if plies > 1:
+            state.begin_turn()
+
+    """Search the phase starting at state and return our choice: a cell index for MOVE, a player index for ATTACK."""
+    def search(self, state: PackedState, phase: int, my_player_index: int):
+        start = time.perf_counter()
+        deadline = start + min(self.budget, self.time_left() - SAFETY)
+        self.my_player_index = my_player_index
+        turns = max(1, min(self.horizon, config.TURNS - state.turn + 1))
+        plies = 2 * turns - phase
+        root = Node(self.arms(state, phase))
+        if phase == MOVE:
+            self.publish(BOARD[root.arms[my_player_index][0]])
+        root_scores = [state.slots[i * STRIDE + SCORE] for i in range(4)]
+
+        iterations = 0
+        nodes = 1
+        while True:
+            nodes += self.iterate(root, state, phase, plies, root_scores)
+            iterations += 1
+            if self.iterations is not None:
+                if iterations >= self.iterations:
+                    break
+            elif iterations % CHECK_EVERY == 0:
+                best = root.best(my_player_index)
+                self.publish(BOARD[best] if phase == MOVE else best)
+                if time.perf_counter() >= deadline:
+                    break
+
+        stats = self.stats
+        stats["searches"] += 1
+        stats["iterations"] += iterations
+        stats["nodes"] += nodes
+        stats["plies"] += iterations * plies
+        stats["seconds"] += time.perf_counter() - start
+        return root.best(my_player_index)
+
+    """Run one selection, expansion, playout and backup from root. Returns the number of nodes added."""
+    def iterate(self, root: Node, state: PackedState, phase: int, plies: int, root_scores: list) -> int:
+        mark = state.mark()
+        path = []
+        node = root
+        added = 0
+        while plies > 0:
+            joint = node.select(self.exploration)
+            path.append((node, joint))
+            self.play(state, phase, [choices[arm] for choices, arm in zip(node.arms, joint)], plies)
+            phase, plies = 1 - phase, plies - 1
+            if plies == 0:
+                break
+            child = node.children.get(joint)
+            if child is None:
+                node.children[joint] = Node(self.arms(state, phase))
+                added = 1
+                break
+            node = child
+
+        while plies > 0:
+            rollout = self.rollout_move if phase == MOVE else self.rollout_attack
+            self.play(state, phase, [rollout(state, i) for i in range(4)], plies)
+            phase, plies = 1 - phase, plies - 1
+
+        rewards = self.evaluate(state, root_scores)
+        for node, joint in path:
+            node.update(joint, rewards)
+        state.undo(mark)
+        return added
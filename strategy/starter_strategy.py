@@ -2,7 +2,8 @@ import itertools
 from game.game_state import GameState
 import game.character_class
 import util.utility
-import game.stat_set
+import util.bitboard
+import util.reachability
 from game.player_state import PlayerState
 
 from game.item import Item
@@ -72,51 +73,18 @@ def hills_with_kills(game_state: GameState, my_player_index: int) -> [Position]:
 # get the maximum range of the given player
 # alex did this one he did he is very proud of it :)
 def get_range(player: PlayerState) -> int:
-    r = 0
-
-    # check player class, assign proper inherent range for class
-    temp = player.character_class.value
-    if isinstance(temp, game.stat_set.StatSet):
-        r = temp.range
-    # add one to range if player has HUNTER SCOPE equipped
-    if (player.item == Item.HUNTER_SCOPE):
-        r += 1
-    return r
+    # class range plus the held passive item's bonus, e.g. one more with a HUNTER SCOPE equipped
+    return player.effective_stats.range
 
 
 def get_speed(player: PlayerState) -> int:
-    speed = 0
-
-    # check player class, assign proper inherent range for class
-    temp = player.character_class.value
-    if isinstance(temp, game.stat_set.StatSet):
-        speed = temp.speed
-
-    # if ( player == Constants.PlayerConstants.MY_PLAYER_STATE ):
-    #     speed //= 2
-    #     speed *= 2
-
-    if (player.item == Item.ANEMOI_WINGS):
-        speed += 1
-    if (player.item == Item.SPEED_POTION):
-        speed += 2
-    return speed
+    # class speed plus the ANEMOI WINGS bonus; a held SPEED POTION adds nothing until used
+    return player.effective_stats.speed
 
 
 def get_damage(player: PlayerState) -> int:
-    damage = 0
-
-    # check player class, assign proper inherent damage for class
-    temp = player.character_class.value
-    if isinstance(temp, game.stat_set.StatSet):
-        damage = temp.damage
-
-    if (player.item == Item.RALLY_BANNER):
-        damage += 2
-    if (player.item == Item.STRENGTH_POTION):
-        damage += 4
-
-    return damage
+    # class damage plus the RALLY BANNER bonus; a held STRENGTH POTION adds nothing until used
+    return player.effective_stats.damage
 
 
 # first item in the return is the range, second item in the return is the player index
@@ -132,28 +100,22 @@ def initialize(game_state: GameState, my_player_index: int) -> None:
 
 # gets all possible locations for a player to move to
 def get_possible(player: PlayerState) -> [Position]:
-    return list(filter(lambda pos: util.utility.manhattan_distance(player.position, pos) <= get_speed(player),
-                       Constants.BoardConstants.BOARD))
+    return list(util.reachability.reachable(player.position, get_speed(player)))
 
 
 # finds the next position for a player to move to based on the target Position
 def get_next_pos(player: PlayerState, target: Position) -> Position:
-    return sorted(list(map(lambda pos: (pos, util.utility.chebyshev_distance(pos, target)), get_possible(player))),
-                  key=lambda pd: pd[1])[0][0]
+    return util.reachability.nearest_reachable(player.position, get_speed(player), target)
 
 
 # finds all hills that are within movement range of the given player
 def hills_in_range(player: PlayerState) -> [Position]:
-    return [hill for hill in Constants.BoardConstants.HILLS if
-            util.utility.manhattan_distance(hill, player.position) <= get_speed(player)]
+    return util.bitboard.cells(util.bitboard.reach(player.position, get_speed(player)) & util.bitboard.HILLS)
 
 
 # finds the closest hill to the position
 def closest_hill(pos: Position) -> Position:
-    return \
-        sorted(
-            list(map(lambda hill: (util.utility.manhattan_distance(pos, hill), hill), Constants.BoardConstants.HILLS)),
-            key=lambda tup: tup[0])[0][1]
+    return min(Constants.BoardConstants.HILLS, key=lambda hill: util.utility.manhattan_distance(pos, hill))
 
 
 # determines if two positions are the same positions
@@ -163,10 +125,10 @@ def same_pos(pos1: Position, pos2: Position) -> bool:
 
 # returns all players that are within attack distance
 def get_attackable(player_index: int, game_state: GameState) -> [(int, PlayerState)]:
-    return list(filter(lambda ip: ip[0] != player_index and util.utility.chebyshev_distance(ip[1].position,
-                                                                                            game_state.player_state_list[
-                                                                                                player_index].position) <= get_range(
-        game_state.player_state_list[player_index]), list(zip(range(4), game_state.player_state_list))))
+    me = game_state.player_state_list[player_index]
+    in_range = util.bitboard.disk(me.position, get_range(me))
+    return [(i, p) for i, p in enumerate(game_state.player_state_list)
+            if i != player_index and util.bitboard.contains(in_range, p.position)]
 
 
 # returns the possible damage to the passed hill tile
@@ -198,6 +160,8 @@ def initialize_turn(my_player_index: int, game_state: GameState) -> None:
 
 
 class StarterStrategy(Strategy):
+    deterministic = True
+
     def strategy_initialize(self, my_player_index: int):
         return Constants.PlayerConstants.START_CLASS
 
@@ -5,6 +5,31 @@ from game.item import Item
 from game.position import Position
 
 class Strategy(object):
+    """Set by main.py while a phase method runs in anytime mode (--deadline), None otherwise.
+    It carries the phase's deadline and the best answer published for it so far.
+    """
+    decision = None
+
+    """Whether the strategy always makes the same decisions in the same game. Tools such as the
+    tournament play a game again only for strategies that do not, like time-budgeted searches.
+    """
+    deterministic = False
+
+    """Offer the best answer found so far for the current phase. In anytime mode it is sent if the
+    phase method does not return before the deadline; otherwise this does nothing.
+
+    :param answer: A value of the type the current phase method returns.
+    """
+    def publish(self, answer) -> None:
+        if self.decision is not None:
+            self.decision.publish(answer)
+
+    """:returns: Seconds left before the current phase's deadline, infinity outside anytime mode."""
+    def time_left(self) -> float:
+        if self.decision is None:
+            return float("inf")
+        return self.decision.time_left()
+
     """Before the game starts, pick a class for your bot to start with.
 
     :returns: A game.CharacterClass Enum.
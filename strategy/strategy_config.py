@@ -1,13 +1,47 @@
+import importlib.util
+import types
+
 from strategy.starter_strategy import StarterStrategy
 from strategy.archer_strat import ArcherStrategy
 from strategy.strategy import Strategy
 
+"""Strategies that tools such as the replay harness can pick by name."""
+STRATEGIES = {
+  "starter": StarterStrategy,
+  "archer": ArcherStrategy,
+}
+
 """Return the strategy that your bot should use.
 
 :param playerIndex: A player index that can be used if necessary.
 
 :returns: A Strategy object.
 """
-def get_strategy(player_index: int) -> Strategy:  
-  
-  return StarterStrategy()
\ No newline at end of file
+def get_strategy(player_index: int) -> Strategy:
+
+  return StarterStrategy()
+
+"""Return a strategy whose module level state is not shared with other strategies in this process.
+
+The strategies keep what they learn (spawn, speed, inactivity counters, ...) in module level
+Constants, so several bots in one process would overwrite each other's. This runs the strategy's
+module again into a private module object; everything it imports, such as the board tables, stays
+shared.
+
+:param playerIndex: A player index that can be used if necessary.
+
+:returns: A Strategy object.
+"""
+def get_isolated_strategy(player_index: int) -> Strategy:
+  return isolated_strategy(type(get_strategy(player_index=player_index)))
+
+"""Return a new strategy_class whose module level state is private, see get_isolated_strategy."""
+def isolated_strategy(strategy_class: type) -> Strategy:
+  spec = importlib.util.find_spec(strategy_class.__module__)
+  module = types.ModuleType(spec.name)
+  module.__spec__ = spec
+  module.__loader__ = spec.loader
+  module.__file__ = spec.origin
+  # get_code works for plain files and for modules inside bot.pyz alike
+  exec(spec.loader.get_code(spec.name), module.__dict__)
+  return getattr(module, strategy_class.__name__)()
@@ -0,0 +1,96 @@
+import config
+
+from game.position import BOARD, Position
+from util.utility import CHEBYSHEV, MANHATTAN, chebyshev_distance, manhattan_distance
+
+# A bitboard is a set of cells packed into one int: bit Position.index is set for every cell in the
+# set, so the 10x10 board fits in 100 bits. Unions and intersections are | and &, the complement
+# is FULL & ~mask, and cells() lists the members in BOARD order.
+
+FULL = (1 << len(BOARD)) - 1
+# no move can cover more than the board's diagonal and no attack more than its side
+MAX_SPEED = 2 * (config.BOARD_SIZE - 1)
+MAX_RANGE = config.BOARD_SIZE - 1
+
+_HILL_COORDS = (config.BOARD_SIZE // 2 - 1, config.BOARD_SIZE // 2)
+_CORNERS = (0, config.BOARD_SIZE - 1)
+HILLS = sum(1 << p.index for p in BOARD if p.x in _HILL_COORDS and p.y in _HILL_COORDS)
+SPAWNS = sum(1 << p.index for p in BOARD if p.x in _CORNERS and p.y in _CORNERS)
+
+# REACH[cell index][speed] is the set of cells within Manhattan distance speed and DISK[cell index][range]
+# the set within Chebyshev distance range, the cells a player there can move to or attack. Like
+# util.reachability, a cell's row is built the first time it is asked for.
+REACH = [None] * len(BOARD)
+DISK = [None] * len(BOARD)
+
+
+def _rings(distances: tuple, limit: int) -> tuple:
+    # masks of the cells at each distance, then summed up so entry d holds every cell within d
+    rings = [0] * (limit + 1)
+    for index, distance in enumerate(distances):
+        rings[min(distance, limit)] |= 1 << index
+    for distance in range(1, limit + 1):
+        rings[distance] |= rings[distance - 1]
+    return tuple(rings)
+
+
+def bit(position: Position) -> int:
+    return 1 << position.index if position.index >= 0 else 0
+
+
+def mask(positions) -> int:
+    result = 0
+    for position in positions:
+        result |= bit(position)
+    return result
+
+
+def contains(board: int, position: Position) -> bool:
+    return position.index >= 0 and (board >> position.index) & 1 == 1
+
+
+"""The cells of a bitboard, in BOARD order."""
+def cells(board: int) -> list:
+    result = []
+    while board:
+        low = board & -board
+        result.append(BOARD[low.bit_length() - 1])
+        board ^= low
+    return result
+
+
+"""Every cell a player at position with the given speed can move to."""
+def reach(position: Position, speed: int) -> int:
+    if speed < 0:
+        return 0
+    if position.index >= 0:
+        row = REACH[position.index]
+        if row is None:
+            row = REACH[position.index] = _rings(MANHATTAN[position.index], MAX_SPEED)
+        return row[min(speed, MAX_SPEED)]
+    return sum(1 << p.index for p in BOARD if manhattan_distance(position, p) <= speed)
+
+
+"""Every cell a player at position with the given range can attack, which is also every cell they can be attacked from."""
+def disk(position: Position, attack_range: int) -> int:
+    if attack_range < 0:
+        return 0
+    if position.index >= 0:
+        row = DISK[position.index]
+        if row is None:
+            row = DISK[position.index] = _rings(CHEBYSHEV[position.index], MAX_RANGE)
+        return row[min(attack_range, MAX_RANGE)]
+    return sum(1 << p.index for p in BOARD if chebyshev_distance(position, p) <= attack_range)
+
+
+"""Every cell in attack range of at least one of the (position, range) threats."""
+def coverage(threats) -> int:
+    covered = 0
+    for position, attack_range in threats:
+        covered |= disk(position, attack_range)
+    return covered
+
+
+"""The cells a player can move to that are out of range of every one of the (position, range) threats."""
+def safe_cells(position: Position, speed: int, threats) -> int:
+    return reach(position, speed) & ~coverage(threats)
@@ -0,0 +1,31 @@
+from game.position import BOARD, Position
+import util.bitboard
+from util.bitboard import MAX_SPEED
+from util.utility import CHEBYSHEV, chebyshev_distance, manhattan_distance
+
+# REACHABLE[cell index][speed] holds the on-board cells within Manhattan distance speed, in BOARD order:
+# the cells of the bitboard util.bitboard.reach(cell, speed), kept as tuples for callers that iterate.
+# A cell's row is built the first time a player stands there, which keeps the table off the bot's startup.
+REACHABLE = [None] * len(BOARD)
+
+def _reachable_row(origin: Position) -> tuple:
+    row = REACHABLE[origin.index] = tuple(tuple(util.bitboard.cells(util.bitboard.reach(origin, speed)))
+                                          for speed in range(MAX_SPEED + 1))
+    return row
+
+# returns every cell a player at position with the given speed can move to
+def reachable(position: Position, speed: int) -> tuple:
+    if speed < 0:
+        return ()
+    if position.index >= 0:
+        row = REACHABLE[position.index] or _reachable_row(position)
+        return row[min(speed, MAX_SPEED)]
+    return tuple(p for p in BOARD if manhattan_distance(position, p) <= speed)
+
+# returns the reachable cell closest to target by Chebyshev distance, the first one in BOARD order on ties
+def nearest_reachable(position: Position, speed: int, target: Position) -> Position:
+    cells = reachable(position, speed)
+    if target.index >= 0:
+        distances = CHEBYSHEV[target.index]
+        return min(cells, key=lambda p: distances[p.index])
+    return min(cells, key=lambda p: chebyshev_distance(p, target))
@@ -0,0 +1,44 @@
+import config
+
+from game.game_state import GameState
+from game.position import Position
+from util.utility import cell_indices, distance_matrices
+
+# Board wide threat and coverage maps. Every map is a BOARD_SIZE x BOARD_SIZE numpy array indexed
+# as grid[x][y] and is computed from the Chebyshev distance table in one vectorized pass, so moves
+# can be scored on every cell rather than on the four hills only. numpy is imported on first use.
+
+
+def _attack_disks(cells, ranges):
+    # row i is True on every cell within Chebyshev distance ranges[i] of cells[i]
+    chebyshev = distance_matrices()[1]
+    return chebyshev[cell_indices(cells)] <= ranges[:, None]
+
+
+# returns the damage every cell can take if the enemies attack from their (predicted) positions
+def threat_map(enemy_poses: [(int, Position)], game_state: GameState):
+    import numpy
+    if not enemy_poses:
+        return numpy.zeros((config.BOARD_SIZE, config.BOARD_SIZE), dtype=numpy.int32)
+    players = [game_state.player_state_list[index] for index, _ in enemy_poses]
+    ranges = numpy.fromiter((p.effective_stats.range for p in players), dtype=numpy.int16, count=len(players))
+    damages = numpy.fromiter((p.effective_stats.damage for p in players), dtype=numpy.int32, count=len(players))
+    disks = _attack_disks([position for _, position in enemy_poses], ranges)
+    return (disks * damages[:, None]).sum(axis=0, dtype=numpy.int32).reshape(config.BOARD_SIZE, config.BOARD_SIZE)
+
+
+# returns, for every cell we could stand on, how many of the enemies we could hit from there
+def coverage_map(my_player_index: int, enemy_poses: [(int, Position)], game_state: GameState):
+    import numpy
+    if not enemy_poses:
+        return numpy.zeros((config.BOARD_SIZE, config.BOARD_SIZE), dtype=numpy.int32)
+    # Chebyshev distance is symmetric, so the cells that reach an enemy are the disk around the enemy
+    my_range = game_state.player_state_list[my_player_index].effective_stats.range
+    ranges = numpy.full(len(enemy_poses), my_range, dtype=numpy.int16)
+    disks = _attack_disks([position for _, position in enemy_poses], ranges)
+    return disks.sum(axis=0, dtype=numpy.int32).reshape(config.BOARD_SIZE, config.BOARD_SIZE)
+
+
+# returns the values of a board map at the given positions, e.g. the threat on every reachable cell
+def values_at(grid, positions):
+    return grid.reshape(-1)[cell_indices(positions)]
@@ -0,0 +1,161 @@
+import json
+import math
+
+# Latency instrumentation for the main loop. Durations come from time.perf_counter_ns() and are
+# counted in log-linear buckets, so recording one costs a few integer operations and no memory.
+
+
+class Histogram:
+    """Counts durations in nanoseconds in buckets a quarter of an octave wide, like HdrHistogram.
+
+    Percentiles are reported as the upper bound of their bucket, at most 25% above the real value.
+    The count, total, min and max are exact.
+    """
+
+    SUB_BUCKETS = 4
+    BUCKETS = 256
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def bucket(ns: int) -> int:
+        if ns < 4:
+            return max(ns, 0)
+        # the top three bits of ns: the octave, then which quarter of it
+        shift = ns.bit_length() - 3
+        return (shift + 1) * 4 + ((ns >> shift) & 3)
+
+    @staticmethod
+    def bounds(index: int) -> (int, int):
+        if index < 4:
+            return index, index + 1
+        shift = index // 4 - 1
+        sub = index % 4
+        return (4 + sub) << shift, (5 + sub) << shift
+
+    def record(self, ns: int) -> None:
+        self.counts[self.bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+
+    def merge(self, other: "Histogram") -> None:
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+
+    def percentile(self, percent: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds(index)[1], self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else 0,
+            "min_us": (self.min or 0) / 1000,
+            "p50_us": self.percentile(50) / 1000,
+            "p90_us": self.percentile(90) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "max_us": self.max / 1000,
+            # [lower bound ns, upper bound ns, count] for every bucket that was hit
+            "buckets": [list(self.bounds(index)) + [count] for index, count in enumerate(self.counts) if count],
+        }
+
+
+class StageTimings:
+    """One Histogram per phase and stage of the main loop, e.g. ("MOVE", "strategy")."""
+
+    def __init__(self) -> None:
+        self.histograms = {}
+
+    def record(self, phase: str, stage: str, ns: int) -> None:
+        try:
+            histogram = self.histograms[phase, stage]
+        except KeyError:
+            histogram = self.histograms[phase, stage] = Histogram()
+        histogram.record(ns)
+
+    def report(self) -> dict:
+        report = {}
+        for (phase, stage), histogram in self.histograms.items():
+            report.setdefault(phase, {})[stage] = histogram.to_dict()
+        return report
+
+    """One line per phase with the median of every stage."""
+    def summary(self) -> str:
+        return "; ".join(phase + ": " + ", ".join("%s %.1fus" % (stage, stages[stage]["p50_us"]) for stage in stages)
+                         for phase, stages in self.report().items())
+
+
+class PhaseProfiler:
+    """Runs cProfile over the phases and turns picked by a spec such as "MOVE,ATTACK,10-20".
+
+    A spec lists phase names and turns or turn ranges, separated by commas. A phase is profiled if
+    it is one of the listed phases and falls on one of the listed turns; leaving out either matches
+    all of them. The profile accumulates over every selected phase.
+    """
+
+    PHASES = ("USE", "MOVE", "ATTACK", "BUY")
+
+    def __init__(self, spec: str) -> None:
+        import cProfile
+        self.phases = set()
+        self.turns = []
+        for item in spec.split(","):
+            item = item.strip().upper()
+            if item in self.PHASES:
+                self.phases.add(item)
+            elif item == "ALL":
+                continue
+            else:
+                first, _, last = item.partition("-")
+                try:
+                    self.turns.append((int(first), int(last or first)))
+                except ValueError:
+                    raise ValueError("Cannot profile " + repr(item) + ", expected a phase name or a turn range")
+        self.profile = cProfile.Profile()
+        self.profiled = 0
+
+    def wants(self, phase: str, turn: int) -> bool:
+        return (not self.phases or phase in self.phases) and \
+               (not self.turns or any(first <= turn <= last for first, last in self.turns))
+
+    """Call func under the profiler. cProfile only sees the calling thread, so call this on the thread that does the work."""
+    def runcall(self, func, *args):
+        self.profiled += 1
+        return self.profile.runcall(func, *args)
+
+    def dump(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+    """The functions with the most cumulative time, as printed by pstats."""
+    def summary(self, limit: int = 20) -> str:
+        import io
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+def dump_report(path: str, report: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+import sys
+
+# A bounded cache from position hashes, such as PackedState.hash, to whatever a strategy wants to keep
+# about a position: an evaluation, a best move, the moves worth searching. Any int key works.
+
+POLICIES = ("always", "depth", "lru")
+
+
+class TranspositionTable:
+    """A position cache of at most capacity entries, with hit rate and memory statistics.
+
+    With the "always" and "depth" policies the table is a fixed array of capacity slots (rounded up
+    to a power of two) indexed by the low bits of the key, as in chess engines: a store into an
+    occupied slot replaces its entry always, or with "depth" only if it was searched at least as
+    deep, so expensive entries survive cheap ones. With "lru" it is a dict that evicts the least
+    recently used entry once full, which keeps every entry until the table fills up.
+
+    Entries hold the full key, so a lookup never returns another position's value, though two
+    positions whose 64 bit hashes collide are indistinguishable.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, policy: str = "depth") -> None:
+        if policy not in POLICIES:
+            raise ValueError("Unknown replacement policy %r, use one of %s" % (policy, ", ".join(POLICIES)))
+        if capacity < 1:
+            raise ValueError("A transposition table needs room for at least one entry")
+        self.policy = policy
+        if policy == "lru":
+            self.capacity = capacity
+            self.entries = OrderedDict()
+        else:
+            self.capacity = 1 << (capacity - 1).bit_length()
+            self.mask = self.capacity - 1
+            # (key, depth, value) or None
+            self.slots = [None] * self.capacity
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        # entries of other positions overwritten or evicted, and stores turned down by the depth policy
+        self.replaced = 0
+        self.rejected = 0
+
+    def get(self, key: int, default=None):
+        if self.policy == "lru":
+            entries = self.entries
+            if key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key][1]
+        else:
+            entry = self.slots[key & self.mask]
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[2]
+        self.misses += 1
+        return default
+
+    """Store value for key, found by a search of the given depth; returns whether it was kept."""
+    def put(self, key: int, value, depth: int = 0) -> bool:
+        if self.policy == "lru":
+            entries = self.entries
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self.capacity:
+                entries.popitem(last=False)
+                self.replaced += 1
+            else:
+                self.size += 1
+            entries[key] = (depth, value)
+            self.stores += 1
+            return True
+
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None:
+            self.size += 1
+        elif entry[0] != key:
+            if self.policy == "depth" and entry[1] > depth:
+                self.rejected += 1
+                return False
+            self.replaced += 1
+        self.slots[index] = (key, depth, value)
+        self.stores += 1
+        return True
+
+    def clear(self) -> None:
+        self.__init__(self.capacity, self.policy)
+
+    def __len__(self) -> int:
+        return self.size
+
+    """Bytes used by the table and its entries, not counting the stored values themselves."""
+    def memory(self) -> int:
+        if self.policy == "lru":
+            entries = self.entries
+            return sys.getsizeof(entries) + sum(sys.getsizeof(key) + sys.getsizeof(entry)
+                                                for key, entry in entries.items())
+        return sys.getsizeof(self.slots) + sum(sys.getsizeof(entry) + sys.getsizeof(entry[0])
+                                               for entry in self.slots if entry is not None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"policy": self.policy, "capacity": self.capacity, "size": self.size, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0, "stores": self.stores,
+                "replaced": self.replaced, "rejected": self.rejected, "memory_bytes": self.memory()}
+
+    def report(self) -> str:
+        stats = self.stats()
+        return "%s table: %d / %d entries, %d hits / %d misses (%.1f%%), %d replaced, %d rejected, %.0f KiB" % (
+            stats["policy"], stats["size"], stats["capacity"], stats["hits"], stats["misses"], stats["hit_rate"] * 100,
+            stats["replaced"], stats["rejected"], stats["memory_bytes"] / 1024)
@@ -1,20 +1,97 @@
 from enum import Enum
 import math
-import random
 
 import config
 
-from game.position import Position
+from game.position import BOARD, Position
+
+# distance tables for every pair of on-board cells, indexed by Position.index
+MANHATTAN = tuple(tuple(abs(p1.x - p2.x) + abs(p1.y - p2.y) for p2 in BOARD) for p1 in BOARD)
+CHEBYSHEV = tuple(tuple(max(abs(p1.x - p2.x), abs(p1.y - p2.y)) for p2 in BOARD) for p1 in BOARD)
+
+# numpy copies of the tables, built on first use so the bot does not pay for importing numpy
+_matrices = None
 
 def manhattan_distance(p1: Position, p2: Position) -> int:
+    if p1.index >= 0 and p2.index >= 0:
+        return MANHATTAN[p1.index][p2.index]
     return abs(p1.x - p2.x) + abs(p1.y - p2.y)
 
 def chebyshev_distance(p1: Position, p2: Position) -> int:
+    if p1.index >= 0 and p2.index >= 0:
+        return CHEBYSHEV[p1.index][p2.index]
     return max(abs(p1.x - p2.x), abs(p1.y - p2.y))
 
+def distance_matrices():
+    global _matrices
+    if _matrices is None:
+        import numpy
+        _matrices = (numpy.array(MANHATTAN, dtype=numpy.int16), numpy.array(CHEBYSHEV, dtype=numpy.int16))
+    return _matrices
+
+def cell_indices(positions):
+    #  Accepts Positions or a numpy array of cell indices; positions off the board have no index and raise ValueError
+    import numpy
+    if not isinstance(positions, numpy.ndarray):
+        positions = numpy.fromiter((p.index for p in positions), dtype=numpy.intp)
+    if positions.size and positions.min() < 0:
+        raise ValueError("Positions off the board have no cell index")
+    return positions
+
+def _positions(positions) -> list:
+    #  a list of Positions, from Positions or a numpy array of cell indices
+    import numpy
+    if isinstance(positions, numpy.ndarray):
+        return [BOARD[index] for index in cell_indices(positions)]
+    return list(positions)
+
+def _on_board(positions) -> bool:
+    return all(p.index >= 0 for p in positions)
+
+def _coordinates(positions):
+    #  x and y of every position as two numpy arrays, for positions the distance tables do not cover
+    import numpy
+    return (numpy.fromiter((p.x for p in positions), dtype=numpy.int64, count=len(positions)),
+            numpy.fromiter((p.y for p in positions), dtype=numpy.int64, count=len(positions)))
+
+#  The vectorized distances look up the tables when every position is on the board and otherwise
+#  fall back to arithmetic, like manhattan_distance and chebyshev_distance.
+def manhattan_distances(origin: Position, positions):
+    import numpy
+    positions = _positions(positions)
+    if origin.index >= 0 and _on_board(positions):
+        return distance_matrices()[0][origin.index, cell_indices(positions)]
+    xs, ys = _coordinates(positions)
+    return numpy.abs(xs - origin.x) + numpy.abs(ys - origin.y)
+
+def chebyshev_distances(origin: Position, positions):
+    import numpy
+    positions = _positions(positions)
+    if origin.index >= 0 and _on_board(positions):
+        return distance_matrices()[1][origin.index, cell_indices(positions)]
+    xs, ys = _coordinates(positions)
+    return numpy.maximum(numpy.abs(xs - origin.x), numpy.abs(ys - origin.y))
+
+def pairwise_manhattan_distances(sources, targets):
+    import numpy
+    sources, targets = _positions(sources), _positions(targets)
+    if _on_board(sources) and _on_board(targets):
+        return distance_matrices()[0][cell_indices(sources)[:, None], cell_indices(targets)[None, :]]
+    (sx, sy), (tx, ty) = _coordinates(sources), _coordinates(targets)
+    return numpy.abs(sx[:, None] - tx[None, :]) + numpy.abs(sy[:, None] - ty[None, :])
+
+def pairwise_chebyshev_distances(sources, targets):
+    import numpy
+    sources, targets = _positions(sources), _positions(targets)
+    if _on_board(sources) and _on_board(targets):
+        return distance_matrices()[1][cell_indices(sources)[:, None], cell_indices(targets)[None, :]]
+    (sx, sy), (tx, ty) = _coordinates(sources), _coordinates(targets)
+    return numpy.maximum(numpy.abs(sx[:, None] - tx[None, :]), numpy.abs(sy[:, None] - ty[None, :]))
+
 def in_bounds(p: Position) -> bool:
     #  Assume board runs from 0 to BOARD_SIZE - 1
     return ((p.x >= 0) and (p.x < config.BOARD_SIZE) and (p.y >= 0) and (p.y < config.BOARD_SIZE))
 
 def random_enum(clazz: Enum):
-    return random.choice(list(clazz))
\ No newline at end of file
+    import random
+    return random.choice(list(clazz))